@@ -0,0 +1,315 @@
+"""
+Artwork thumbnails cache of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from io import BytesIO
+
+from aiohttp import ClientError, ClientTimeout
+from PIL import Image
+
+from sessions import session_manager
+
+_LOGGER = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (300, 300)
+ARTWORK_DIRECTORY = "artwork"
+ARTWORK_INDEX_FILENAME = "index.json"
+ARTWORK_MEMORY_BYTES = 2 * 1024 * 1024
+ARTWORK_DISK_BYTES = 20 * 1024 * 1024
+ARTWORK_REVALIDATE_AFTER = 24 * 60 * 60
+ARTWORK_DOWNLOAD_TIMEOUT = ClientTimeout(total=10)
+IMAGE_POOL_WORKERS = 2
+IMAGE_POOL_MAX_PENDING = 8
+
+DATA_URI_PREFIX = "data:image/jpeg;base64,"
+
+
+@dataclass
+class _ArtworkRecord:
+    """Disk index record of a thumbnail."""
+
+    digest: str
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+    checked: float = 0
+    accessed: float = 0
+
+
+def make_thumbnail(content: bytes, size: tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+    """Decode the given image, resize it and encode it in JPEG."""
+    image = Image.open(BytesIO(content))
+    # JPEG images are decoded directly at a reduced scale (still larger than the target size)
+    image.draft("RGB", size)
+    if image.mode in ("RGBA", "P"):
+        image = image.convert("RGB")
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class ImagePool:
+    """Bounded worker pool decoding, resizing and encoding images off the event loop.
+
+    Pillow releases the GIL while decoding, resampling and encoding, so worker threads are enough to keep the loop
+    responsive. At most ``max_pending`` images are queued or processed at a time, further callers wait for a slot.
+    Cancelling a caller drops its image if a worker has not started it yet.
+    """
+
+    def __init__(self, workers: int = IMAGE_POOL_WORKERS, max_pending: int = IMAGE_POOL_MAX_PENDING):
+        """Create the pool, worker threads are started on demand."""
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artwork")
+        self._slots = asyncio.Semaphore(max_pending)
+
+    async def thumbnail(self, content: bytes, size: tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+        """Return the JPEG thumbnail of the given image, computed by a worker thread."""
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, make_thumbnail, content, size)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, queued images are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ArtworkCache:
+    """Two-tier thumbnail cache : memory LRU of data URIs and content-addressed JPEG files on disk.
+
+    Thumbnails are keyed by image URL and target size, both tiers are bounded in bytes and the least recently used
+    thumbnails are evicted first. Cached thumbnails older than ``ARTWORK_REVALIDATE_AFTER`` are revalidated with a
+    conditional request (ETag / Last-Modified) before being downloaded and encoded again.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = ARTWORK_MEMORY_BYTES,
+        disk_bytes: int = ARTWORK_DISK_BYTES,
+        pool: ImagePool | None = None,
+    ):
+        """Create the artwork cache, the disk tier is enabled by ``set_path``."""
+        self._pool = pool if pool is not None else ImagePool()
+        self._memory_bytes = memory_bytes
+        self._disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_size = 0
+        self._path: str | None = None
+        self._index: dict[str, _ArtworkRecord] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Number of callers holding or waiting for the lock of each key
+        self._lock_users: Counter[str] = Counter()
+        self._index_task: asyncio.Task | None = None
+        self._index_pending = False
+
+    @staticmethod
+    def key(url: str, size: tuple[int, int]) -> str:
+        """Return the cache key of the given URL and size."""
+        return f"{size[0]}x{size[1]}:{url}"
+
+    def set_path(self, data_path: str) -> None:
+        """Enable the disk tier in the given directory and load its index, the directory is created on first write."""
+        self._path = os.path.join(data_path, ARTWORK_DIRECTORY)
+        try:
+            with open(os.path.join(self._path, ARTWORK_INDEX_FILENAME), "r", encoding="utf-8") as f:
+                self._index = {key: _ArtworkRecord(**record) for key, record in json.load(f).items()}
+            _LOGGER.debug("Artwork cache loaded: %s thumbnails", len(self._index))
+        except FileNotFoundError:
+            pass
+        except (OSError, TypeError, ValueError, AttributeError) as ex:
+            _LOGGER.warning("Cannot load the artwork cache index: %s", ex)
+            self._index = {}
+
+    async def get(self, url: str, size: tuple[int, int] = THUMBNAIL_SIZE) -> str | None:
+        """Return the thumbnail of the given image URL as a JPEG data URI."""
+        key = self.key(url, size)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] += 1
+        try:
+            async with lock:
+                return await self._get(key, url, size)
+        finally:
+            # The lock is released before the next waiter acquires it : keep it until its last user is done
+            self._lock_users[key] -= 1
+            if self._lock_users[key] <= 0:
+                del self._lock_users[key]
+                del self._locks[key]
+
+    def peek(self, url: str, size: tuple[int, int] = THUMBNAIL_SIZE) -> str | None:
+        """Return the thumbnail of the given image URL if it is in memory, without revalidating it."""
+        key = self.key(url, size)
+        data_uri = self._memory.get(key, None)
+        if data_uri is not None:
+            self._memory.move_to_end(key)
+        return data_uri
+
+    async def _get(self, key: str, url: str, size: tuple[int, int]) -> str | None:
+        # pylint: disable=R0914
+        now = time.time()
+        record = self._index.get(key, None)
+        fresh = record is not None and now - record.checked < ARTWORK_REVALIDATE_AFTER
+        data_uri = self._memory.get(key, None)
+        if data_uri is not None and (fresh or self._path is None):
+            self._memory.move_to_end(key)
+            if record:
+                record.accessed = now
+            return data_uri
+
+        thumbnail = None
+        if record is not None:
+            thumbnail = await self._read(record.digest)
+            if thumbnail is None:
+                record = None
+            elif fresh:
+                record.accessed = now
+                return self._remember(key, thumbnail)
+
+        headers = {}
+        if record is not None:
+            if record.etag:
+                headers["If-None-Match"] = record.etag
+            if record.last_modified:
+                headers["If-Modified-Since"] = record.last_modified
+        try:
+            async with session_manager.session().get(
+                url, headers=headers, ssl=session_manager.ssl_context_no_verify, timeout=ARTWORK_DOWNLOAD_TIMEOUT
+            ) as response:
+                if response.status == 304 and thumbnail is not None:
+                    record.checked = record.accessed = now
+                    self._save_index()
+                    return self._remember(key, thumbnail)
+                content = await response.read()
+                etag = response.headers.get("ETag", None)
+                last_modified = response.headers.get("Last-Modified", None)
+            thumbnail = await self._pool.thumbnail(content, size)
+        except (ClientError, asyncio.TimeoutError, OSError, ValueError) as ex:
+            _LOGGER.warning("Error downloading media image %s: %s", url, ex)
+            return self._remember(key, thumbnail) if thumbnail is not None else None
+
+        if self._path is not None:
+            digest = hashlib.sha256(thumbnail).hexdigest()
+            self._index[key] = _ArtworkRecord(
+                digest=digest, size=len(thumbnail), etag=etag, last_modified=last_modified, checked=now, accessed=now
+            )
+            await self._write(digest, thumbnail)
+            await self._evict_disk()
+            self._save_index()
+        return self._remember(key, thumbnail)
+
+    def _remember(self, key: str, thumbnail: bytes) -> str:
+        """Store the thumbnail in the memory tier and return its data URI."""
+        data_uri = DATA_URI_PREFIX + base64.b64encode(thumbnail).decode("utf-8")
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = data_uri
+        self._memory_size += len(data_uri)
+        while self._memory_size > self._memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+        return data_uri
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._path, f"{digest}.jpg")
+
+    async def _read(self, digest: str) -> bytes | None:
+        """Read the thumbnail of the given digest from disk."""
+        if self._path is None:
+            return None
+
+        def read() -> bytes | None:
+            try:
+                with open(self._blob_path(digest), "rb") as f:
+                    return f.read()
+            except OSError:
+                return None
+
+        return await asyncio.get_running_loop().run_in_executor(None, read)
+
+    async def _write(self, digest: str, thumbnail: bytes) -> None:
+        """Write the thumbnail to disk, identical thumbnails share the same file."""
+
+        def write() -> None:
+            path = self._blob_path(digest)
+            if os.path.exists(path):
+                return
+            try:
+                os.makedirs(self._path, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(thumbnail)
+            except OSError as ex:
+                _LOGGER.warning("Cannot write artwork thumbnail %s: %s", path, ex)
+
+        await asyncio.get_running_loop().run_in_executor(None, write)
+
+    async def _evict_disk(self) -> None:
+        """Remove the least recently used thumbnails until the disk tier fits in its size limit."""
+        digests: dict[str, int] = {}
+        for record in self._index.values():
+            digests[record.digest] = record.size
+        total = sum(digests.values())
+        if total <= self._disk_bytes:
+            return
+        paths = []
+        for key, record in sorted(self._index.items(), key=lambda item: item[1].accessed):
+            if total <= self._disk_bytes:
+                break
+            del self._index[key]
+            if any(other.digest == record.digest for other in self._index.values()):
+                continue
+            total -= record.size
+            paths.append(self._blob_path(record.digest))
+
+        def remove() -> None:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        await asyncio.get_running_loop().run_in_executor(None, remove)
+
+    def _save_index(self) -> None:
+        """Queue the save of the disk index : one write at a time, the queued ones are coalesced."""
+        if self._path is None:
+            return
+        self._index_pending = True
+        if self._index_task is None:
+            self._index_task = asyncio.get_running_loop().create_task(self._index_writer())
+
+    async def _index_writer(self) -> None:
+        """Write the current disk index until no save is queued."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._index_pending:
+                self._index_pending = False
+                index = {key: asdict(record) for key, record in self._index.items()}
+                await loop.run_in_executor(None, self._write_index, index)
+        finally:
+            self._index_task = None
+
+    def _write_index(self, index: dict[str, dict]) -> None:
+        """Write the given disk index."""
+        path = os.path.join(self._path, ARTWORK_INDEX_FILENAME)
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            _LOGGER.warning("Cannot write the artwork cache index: %s", ex)
+
+
+artwork_cache = ArtworkCache()
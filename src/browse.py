@@ -0,0 +1,85 @@
+"""
+Browse responses cache shared by all the Orange TV clients of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from ucapi.api_definitions import BrowseMediaItem, Pagination
+
+from epg import Program
+
+_LOGGER = logging.getLogger(__name__)
+
+BROWSE_PAGE_CACHE_SIZE = 64
+BROWSE_ITEM_CACHE_SIZE = 2048
+BROWSE_PAGE_TTL = 60
+
+# (country, media id, media type, page, limit, EPG guide version)
+PageKey = tuple[str, str, str | None, int, int, int]
+
+
+class BrowseCache:
+    """Memoization of the rendered browse pages and items.
+
+    Pages are keyed by EPG guide version and expire at the first program boundary of their content, pages of the
+    previous versions of a guide are dropped as soon as a newer version is rendered. Items are keyed by program
+    record : the programs left untouched by an EPG refresh keep their rendered items.
+    """
+
+    def __init__(self, page_size: int = BROWSE_PAGE_CACHE_SIZE, item_size: int = BROWSE_ITEM_CACHE_SIZE):
+        """Create the browse cache with the given number of pages and items."""
+        self._page_size = page_size
+        self._item_size = item_size
+        self._pages: OrderedDict[PageKey, tuple[float, BrowseMediaItem, Pagination]] = OrderedDict()
+        self._items: OrderedDict[tuple[int, Hashable], tuple[Program, BrowseMediaItem]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+
+    def get_page(self, key: PageKey, now: float) -> tuple[BrowseMediaItem, Pagination] | None:
+        """Return the cached page of the given key if still valid."""
+        page = self._pages.get(key, None)
+        if page is None or page[0] <= now:
+            return None
+        self._pages.move_to_end(key)
+        return page[1], page[2]
+
+    def set_page(self, key: PageKey, expires: float, result: BrowseMediaItem, paging: Pagination) -> None:
+        """Store the given page until the given expiry timestamp."""
+        country, version = key[0], key[5]
+        if version > self._versions.get(country, 0):
+            self._versions[country] = version
+            for old_key in [old_key for old_key in self._pages if old_key[0] == country and old_key[5] < version]:
+                del self._pages[old_key]
+        self._pages[key] = (expires, result, paging)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self._page_size:
+            self._pages.popitem(last=False)
+
+    def get_item(
+        self, program: Program, variant: Hashable, render: Callable[[Program], BrowseMediaItem]
+    ) -> BrowseMediaItem:
+        """Return the rendered item of the given program, rendered once per variant (parent path...)."""
+        key = (id(program), variant)
+        cached = self._items.get(key, None)
+        # The identifier of a released program may be reused by a new one
+        if cached is not None and cached[0] is program:
+            self._items.move_to_end(key)
+            return cached[1]
+        item = render(program)
+        self._items[key] = (program, item)
+        self._items.move_to_end(key)
+        while len(self._items) > self._item_size:
+            self._items.popitem(last=False)
+        return item
+
+    def clear(self) -> None:
+        """Remove all the cached pages and items."""
+        self._pages.clear()
+        self._items.clear()
+
+
+browse_cache = BrowseCache()
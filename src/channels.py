@@ -0,0 +1,140 @@
+"""
+Channel lookups of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterator
+
+from fuzzywuzzy import fuzz, process
+
+Channel = dict[str, str]
+
+MATCHER_CACHE_SIZE = 256
+CHANNEL_NAME_SUFFIXES = ("hd", "uhd", "4k", "sd")
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a channel name for exact lookups."""
+    return name.strip().casefold()
+
+
+def fold_name(name: str) -> str:
+    """Fold a channel name for fuzzy matching : accents, case and punctuation are removed."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char)).casefold()
+    return _NON_ALPHANUMERIC.sub(" ", name).strip()
+
+
+def strip_suffixes(folded_name: str) -> str:
+    """Remove the definition suffixes ("HD", "4K"...) of a folded channel name."""
+    words = folded_name.split()
+    while len(words) > 1 and words[-1] in CHANNEL_NAME_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+class ChannelMatcher:
+    """Channel name matcher over pre-normalized names, with memoization of past queries."""
+
+    # pylint: disable=R0903
+
+    def __init__(self, channels: tuple[Channel, ...], cache_size: int = MATCHER_CACHE_SIZE):
+        """Prepare the folded names of the given channels."""
+        self._channels = channels
+        self._by_folded: dict[str, Channel] = {}
+        self._by_base: dict[str, Channel] = {}
+        self._choices: dict[int, str] = {}
+        for i, channel in enumerate(channels):
+            folded = fold_name(channel["name"])
+            self._by_folded.setdefault(folded, channel)
+            self._choices[i] = folded
+        # Channels without suffix are preferred ("TF1" over "TF1 4K")
+        for channel in sorted(channels, key=lambda chan: len(fold_name(chan["name"]))):
+            self._by_base.setdefault(strip_suffixes(fold_name(channel["name"])), channel)
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, name: str) -> Channel | None:
+        """Return the channel which best matches the given name."""
+        folded = fold_name(name)
+        channel = self._by_folded.get(folded, None)
+        if channel:
+            return channel
+        channel = self._by_base.get(strip_suffixes(folded), None)
+        if channel:
+            return channel
+        result = process.extractOne(folded, self._choices, processor=None, scorer=fuzz.ratio)
+        if result is None:
+            return None
+        return self._channels[result[2]]
+
+
+class ChannelIndex:
+    """Immutable index of the channels of a country, by EPG id, channel number and name."""
+
+    __slots__ = ("_channels", "_names", "_by_epg_id", "_by_index", "_by_name", "_matcher")
+
+    def __init__(self, channels: list[Channel]):
+        """Build the index of the given channels, the first channel wins on duplicate keys."""
+        self._channels: tuple[Channel, ...] = tuple(channels)
+        self._names: tuple[str, ...] = tuple(channel["name"] for channel in self._channels)
+        self._by_epg_id: dict[str, Channel] = {}
+        self._by_index: dict[str, Channel] = {}
+        self._by_name: dict[str, Channel] = {}
+        for channel in self._channels:
+            self._by_epg_id.setdefault(channel["epg_id"], channel)
+            self._by_index.setdefault(channel["index"], channel)
+            self._by_name.setdefault(normalize_name(channel["name"]), channel)
+        self._matcher = ChannelMatcher(self._channels)
+
+    def __len__(self) -> int:
+        """Return the number of channels."""
+        return len(self._channels)
+
+    def __iter__(self) -> Iterator[Channel]:
+        """Iterate over the channels."""
+        return iter(self._channels)
+
+    @property
+    def channels(self) -> tuple[Channel, ...]:
+        """Return the channels."""
+        return self._channels
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Return the channel names."""
+        return self._names
+
+    def by_epg_id(self, epg_id: str) -> Channel | None:
+        """Return the channel of the given EPG id."""
+        return self._by_epg_id.get(epg_id, None)
+
+    def by_index(self, index: str) -> Channel | None:
+        """Return the channel of the given channel number."""
+        return self._by_index.get(index, None)
+
+    def by_name(self, name: str) -> Channel | None:
+        """Return the channel of the given name, case insensitive."""
+        return self._by_name.get(normalize_name(name), None)
+
+    def match(self, name: str) -> Channel | None:
+        """Return the channel which best matches the given name (accents, case and suffixes insensitive)."""
+        return self._matcher.match(name)
+
+
+_channel_indexes: dict[str, ChannelIndex] = {}
+
+
+def get_channel_index(country: str, channels: list[Channel]) -> ChannelIndex:
+    """Return the channel index of the given country, built once."""
+    index = _channel_indexes.get(country, None)
+    if index is None:
+        index = ChannelIndex(channels)
+        _channel_indexes[country] = index
+    return index
@@ -8,23 +8,27 @@ This module implements the Orange TV communication of the Remote Two integration
 """
 
 import asyncio
-import base64
-import calendar
 import datetime
 import json
 import logging
-import ssl
 import time
-from asyncio import CancelledError, Lock, Task
+from asyncio import Task
 from collections import OrderedDict
 from datetime import timedelta
 from enum import StrEnum
 from functools import wraps
-from io import BytesIO
-from typing import Any, Awaitable, Callable, Concatenate, Coroutine, ParamSpec, TypeVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Concatenate,
+    Coroutine,
+    ParamSpec,
+    Sequence,
+    TypeVar,
+)
 
 import aiohttp
-import certifi
 import ucapi.media_player
 from aiohttp import (
     ClientConnectionError,
@@ -34,8 +38,6 @@ from aiohttp import (
 )
 from aiohttp.web_exceptions import HTTPRequestTimeout
 from dateutil import tz
-from fuzzywuzzy import process
-from PIL import Image
 from pyee.asyncio import AsyncIOEventEmitter
 from ucapi.api_definitions import BrowseMediaItem, MediaClass
 from ucapi.api_definitions import MediaContentType as MediaType
@@ -44,6 +46,10 @@ from ucapi.media_player import Attributes, States
 from ucapi.select import Attributes as SelectAttributes
 from ucapi.select import States as SelectStates
 
+from artwork import artwork_cache
+from browse import BROWSE_PAGE_TTL, browse_cache
+from channels import get_channel_index
+from coalesce import SingleFlight
 from config import OrangeConfigDevice
 from const import (  # EPG_URL,; EPG_USER_AGENT,
     KEYS,
@@ -53,6 +59,18 @@ from const import (  # EPG_URL,; EPG_USER_AGENT,
     OrangeSelects,
     OrangeSensors,
 )
+from epg import (
+    EPG_STREAM_CHUNK_SIZE,
+    EpgData,
+    EpgGuide,
+    EpgTimeline,
+    Program,
+    TimelineView,
+    epg_cache,
+)
+from providers import get_epg_provider
+from scheduler import AdaptivePollInterval, PollScheduler
+from sessions import session_manager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -73,10 +91,14 @@ _OrangeDeviceT = TypeVar("_OrangeDeviceT", bound="OrangeTVClient")
 _P = ParamSpec("_P")
 
 CONNECTION_RETRIES = 10
-UPDATE_LOCK_TIMEOUT = 10.0
 ERROR_OS_WAIT = 0.5
-EPG_REFRESH = 10 * 60
-THUMBNAIL_SIZE = (300, 300)
+# Read-only STB operations which can be shared between concurrent callers
+COALESCED_OPERATIONS = frozenset({OPERATION_INFORMATION})
+# Maximum gap in seconds between the actual position and the one extrapolated by the Remote before sending it again
+POSITION_DRIFT_THRESHOLD = 3
+POSITION_ATTRIBUTES = frozenset({Attributes.MEDIA_POSITION, Attributes.MEDIA_POSITION_UPDATED_AT})
+
+_epg_requests = SingleFlight()
 
 
 def debounce(wait):
@@ -137,8 +159,18 @@ class OrangeTVClient:
 
     # pylint: disable = E0606, R0915
 
-    def __init__(self, device_config: OrangeConfigDevice, timeout=3, refresh_frequency=60, device_id=None):
-        """Create a Orange STB instance."""
+    def __init__(
+        self,
+        device_config: OrangeConfigDevice,
+        timeout=3,
+        refresh_frequency=60,
+        device_id=None,
+        poll_scheduler: PollScheduler | None = None,
+    ):
+        """Create a Orange STB instance.
+
+        The device is polled only if a poll scheduler is given.
+        """
         if device_id is None:
             self.id = device_config.id
         else:
@@ -147,16 +179,11 @@ class OrangeTVClient:
         self.port = device_config.port
         self.country = device_config.country
         self._device_config = device_config
-        # import const for country
-        if self.country == "france":
-            # pylint: disable = C0415
-            from const_france import CHANNELS, EPG_URL, EPG_USER_AGENT, TIMEZONE
-        elif self.country == "poland":
-            # pylint: disable = C0415
-            from const_poland import CHANNELS, EPG_URL, EPG_USER_AGENT, TIMEZONE
-        self.channels = CHANNELS
-        self.epg_url = EPG_URL
-        self.epg_user_agent = EPG_USER_AGENT
+        self._epg_provider = get_epg_provider(self.country)
+        self.channels = self._epg_provider.channels
+        self._channel_index = get_channel_index(self.country, self.channels)
+        self.epg_url = self._epg_provider.url
+        self.epg_user_agent = self._epg_provider.user_agent
         self.timeout = timeout
         self.refresh_frequency = timedelta(seconds=refresh_frequency)
         # data from livebox
@@ -176,27 +203,34 @@ class OrangeTVClient:
         self._show_title = None
         self._show_definition = None
         self._show_img = None
+        self._artwork_task: Task | None = None
+        # Image URL and thumbnail data URI of the current show
+        self._show_thumbnail: tuple[str, str] | None = None
         self._show_start_dt = 0
         self._show_duration = 0
         self._show_position = 0
+        self._show_position_at = 0.0
+        # Last position sent to the Remote and its timestamp, from which the Remote extrapolates the position
+        self._position_anchor: tuple[int, float] | None = None
+        self._timeline: EpgTimeline | None = None
+        self._program_timer: asyncio.TimerHandle | None = None
         self._last_channel_id = None
-        self._cache_channel_img = {}
         self._state = States.UNKNOWN
         self._event_loop = asyncio.get_event_loop() or asyncio.get_running_loop()
         self.events = AsyncIOEventEmitter(self._event_loop)
-        self._timezone = tz.gettz(TIMEZONE)
-        self._epg_channel_data = None
-        self._update_lock = Lock()
-        self._update_lock_time: float = 0
+        self._timezone = tz.gettz(self._epg_provider.timezone)
+        self._requests = SingleFlight()
+        # Incremented by every command : requests started before a command are not shared with the ones after it
+        self._command_generation = 0
+        self._update_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
         self._session: ClientSession | None = None
         self._reconnect_retry = 0
-        self._update_task = None
-        self._sslcontext = ssl.create_default_context(cafile=certifi.where())
-        self._epg_data: dict[str, list[dict[str, Any]]] | None = None
-        self._epg_data_timestamp = 0
-        self._ssl_context_no_ssl = ssl.create_default_context()
-        self._ssl_context_no_ssl.check_hostname = False
-        self._ssl_context_no_ssl.verify_mode = ssl.CERT_NONE
+        self._poll_scheduler = poll_scheduler
+        self._polling = False
+        self._poll_interval = AdaptivePollInterval(device_config.poll_min_interval, device_config.poll_max_interval)
+        self._request_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        self._headers = {"User-Agent": self.epg_user_agent}
 
     def refresh_state(self):
         """Refresh the current media state."""
@@ -216,91 +250,90 @@ class OrangeTVClient:
 
     async def connect(self):
         """Connect to SDB."""
-        if self._session:
-            await self._session.close()
-            self._session = None
-        session_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
-        # connector = aiohttp.TCPConnector(ssl=False)
-        self._session = aiohttp.ClientSession(
-            headers={"User-Agent": self.epg_user_agent}, timeout=session_timeout, raise_for_status=True, trust_env=True
-        )
+        # The session is borrowed from the driver-wide connection pool
+        self._session = session_manager.session()
         self.events.emit(Events.CONNECTED, self.id)
         await self.start_polling()
 
     async def disconnect(self):
         """Disconnect from STB."""
         await self.stop_polling()
-        if self._session:
-            await self._session.close()
-            self._session = None
+        self._cancel_artwork()
+        self._cancel_program_timer()
+        self._session = None
 
-    def _find_epg_entry(self, data, exact_match=False) -> dict[str, Any] | None:
-        if data is None:
+    @staticmethod
+    def _find_epg_entry(timeline: EpgTimeline | None, exact_match=False) -> Program | None:
+        if timeline is None:
             return None
-        now = datetime.datetime.now(self._timezone)
-        for entry in data:
-            show_start_dt = entry["diffusionDate"]
-            show_duration = entry["duration"]
-            show_start = datetime.datetime.fromtimestamp(show_start_dt, self._timezone)
-            show_end = show_start + datetime.timedelta(0, show_duration)
-            if show_start <= now < show_end:
-                return entry
-        if not exact_match:
-            return data[0]
-        return None
+        entry = timeline.current()
+        if entry is None and not exact_match:
+            return timeline.first()
+        return entry
+
+    async def _get_epg_channel_guide(self, channel_id) -> EpgGuide | None:
+        if not self._epg_provider.channel_requests:
+            # Channels are looked up in the whole guide, served while it covers the channel and refreshed in background
+            return await epg_cache.get_guide(
+                self._epg_provider, None, self.get_epg, allow_stale=epg_cache.covers(self.country, channel_id)
+            )
+        return await epg_cache.get_guide(self._epg_provider, channel_id, lambda: self.get_epg(channel_id))
 
-    async def _get_epg_channel_data(self, channel_id) -> dict[str, Any] | None:
-        if self._epg_channel_data is None or self._epg_channel_data.get(channel_id, None) is None:
-            self._epg_channel_data = await self.get_epg(self._channel_id)
-            return self._epg_channel_data
-        epg_data = self._epg_channel_data.get(channel_id, None)
-        found_data = self._find_epg_entry(epg_data, True)
-        if found_data:
-            return self._epg_channel_data
-        self._epg_channel_data = await self.get_epg(self._channel_id)
-        return self._epg_channel_data
-
-    async def _background_update_task(self):
-        self._reconnect_retry = 0
-        while True:
-            if not self._device_config.always_on:
-                if not self.standby_state:
-                    self._reconnect_retry += 1
-                    if self._reconnect_retry > CONNECTION_RETRIES:
-                        _LOGGER.debug(
-                            "[%s] Stopping update task as the device %s is off", self._device_config.address, self.id
-                        )
-                        break
+    async def _get_epg_guide(self, allow_stale=False) -> EpgGuide | None:
+        channels_fetcher = self._get_epg_channels if self._epg_provider.channel_requests else None
+        return await epg_cache.get_guide(
+            self._epg_provider, None, self.get_epg, allow_stale=allow_stale, channels_fetcher=channels_fetcher
+        )
+
+    async def _get_epg_channels(self, channel_ids: list[str]) -> dict[str, Any] | None:
+        return await self.get_epg(",".join(channel_ids))
+
+    async def _poll(self) -> bool:
+        """Poll the device, return False to stop polling."""
+        if not self._device_config.always_on:
+            if not self.standby_state:
+                self._reconnect_retry += 1
+                if self._reconnect_retry > CONNECTION_RETRIES:
                     _LOGGER.debug(
-                        "[%s] Device %s is off, retry %s", self._device_config.address, self.id, self._reconnect_retry
+                        "[%s] Stopping update task as the device %s is off", self._device_config.address, self.id
                     )
-                elif self._reconnect_retry > 0:
-                    self._reconnect_retry = 0
-                    _LOGGER.debug("[%s] Device %s is on again", self._device_config.address, self.id)
-            await self.update()
-            await asyncio.sleep(10)
-        self._update_task = None
-        await self.disconnect()
+                    self._polling = False
+                    await self.disconnect()
+                    return False
+                _LOGGER.debug(
+                    "[%s] Device %s is off, retry %s", self._device_config.address, self.id, self._reconnect_retry
+                )
+            elif self._reconnect_retry > 0:
+                self._reconnect_retry = 0
+                _LOGGER.debug("[%s] Device %s is on again", self._device_config.address, self.id)
+        await self.update()
+        return True
+
+    def _next_poll_interval(self) -> float:
+        program_end = None
+        # The end of the program is handled by its timer if any
+        if self._show_start_dt > 0 and self._program_timer is None:
+            program_end = self._show_start_dt + self._show_duration
+        return self._poll_interval.next_interval(not self.standby_state, program_end)
 
     async def start_polling(self):
-        """Start polling task."""
-        if self._update_task is not None:
+        """Start polling the device, or poll faster if it is already polled."""
+        if self._poll_scheduler is None:
+            return
+        if self._polling:
+            self._poll_interval.on_command()
+            self._poll_scheduler.wake(self.id)
             return
-        _LOGGER.debug("[%s] Start polling task for device %s", self._device_config.address, self.id)
-        self._update_task = self._event_loop.create_task(self._background_update_task())
+        _LOGGER.debug("[%s] Start polling device %s", self._device_config.address, self.id)
+        self._polling = True
+        self._reconnect_retry = 0
+        self._poll_scheduler.add(self.id, self._poll, self._next_poll_interval)
 
     async def stop_polling(self):
-        """Stop polling task."""
-        if self._update_task:
-            try:
-                self._update_task.cancel()
-            except CancelledError:
-                pass
-            self._update_task = None
-            try:
-                self._update_lock.release()
-            except RuntimeError:
-                pass
+        """Stop polling the device."""
+        if self._polling:
+            self._polling = False
+            self._poll_scheduler.remove(self.id, self._poll)
 
     @debounce(2)
     async def manual_update(self):
@@ -310,57 +343,182 @@ class OrangeTVClient:
         """
         await self.update()
 
-    def get_media_image_url(self, entry: dict[str, Any]) -> str | None:
+    def get_media_image_url(self, entry: Program) -> str | None:
         """Get media image url."""
-        if self.country != "poland":
-            if entry["covers"] and len(entry["covers"]) > 1:
-                return entry["covers"][1]["url"]
-            if entry["covers"] and len(entry["covers"]) > 0:
-                return entry["covers"][0]["url"]
-        if entry.get("imagePath", None) is not None:
-            image_path = entry.get("imagePath", None)
-            return f"https://tvgo.orange.pl{image_path}"
-        return None
+        return self._epg_provider.image_url(entry)
 
-    async def get_media_image_buffer(self, entry: dict[str, Any]) -> str | None:
-        """Get media image buffer."""
-        image_url = self.get_media_image_url(entry)
-        if image_url:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url, ssl=self._ssl_context_no_ssl) as response:
-                        response.raise_for_status()
-                        content = await response.read()
-                image = Image.open(BytesIO(content))
-                if image.mode in ("RGBA", "P"):
-                    image = image.convert("RGB")
-                image.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-                buffer = BytesIO()
-                image.save(buffer, format="JPEG")
-                buffer.seek(0)
-                return "data:image/jpeg;base64," + base64.b64encode(buffer.read()).decode("utf-8")
-            except Exception as ex:  # pylint: disable=W0718
-                _LOGGER.warning("[%s] Error downloading media image %s", self._device_config.address, ex)
-        return None
+    def _load_artwork(self, image_url: str) -> None:
+        """Load the thumbnail of the given show image in background, it is sent as media image once loaded."""
+        self._cancel_artwork(image_url)
+        if self._artwork_task is not None:
+            return
+        task = self._event_loop.create_task(artwork_cache.get(image_url), name=image_url)
+        task.add_done_callback(self._on_artwork)
+        self._artwork_task = task
+
+    def _on_artwork(self, task: Task) -> None:
+        """Send the loaded thumbnail as media image, or the image URL if it could not be loaded."""
+        if self._artwork_task is task:
+            self._artwork_task = None
+        if task.cancelled() or task.get_name() != self.show_img:
+            return
+        if task.exception() is not None:
+            _LOGGER.warning("[%s] Error loading media image: %s", self._device_config.address, task.exception())
+        elif task.result() is not None:
+            self._show_thumbnail = (task.get_name(), task.result())
+        self.events.emit(Events.UPDATE, self._device_config.id, {Attributes.MEDIA_IMAGE_URL: self.media_image_url})
+
+    def _cancel_artwork(self, image_url: str | None = None) -> None:
+        """Cancel the pending artwork request unless it is for the given image."""
+        task = self._artwork_task
+        if task is None or task.get_name() == image_url:
+            return
+        if not task.done():
+            _LOGGER.debug("[%s] Cancelling artwork request %s", self._device_config.address, task.get_name())
+            task.cancel()
+        self._artwork_task = None
 
     async def update(self):
-        """Update method to refresh data."""
-        # pylint: disable=R0914,R1702,R0915
-        if self._update_lock.locked():
-            _LOGGER.debug("[%s] Update is locked", self._device_config.address)
-            if time.time() - self._update_lock_time > UPDATE_LOCK_TIMEOUT:
-                _LOGGER.warning(
-                    "[%s] Update is locked since a too long time, unlock it anyway", self._device_config.address
-                )
-                try:
-                    self._update_lock.release()
-                except RuntimeError:
-                    pass
+        """Update method to refresh data, concurrent calls share the same refresh.
+
+        A refresh started before the last command is not shared : the next one waits for it and starts afresh.
+        """
+        return await self._requests.do(("update", self._command_generation), self._locked_update)
+
+    async def _locked_update(self):
+        async with self._update_lock:
+            return await self._update()
+
+    def _set_program(self, entry: Program) -> None:
+        """Set the show information from the given program."""
+        if entry.is_episode:
+            self._media_type = MediaType.VIDEO
+            self._show_series_title = entry.title
+            self._show_season = entry.season
+            self._show_episode = entry.episode
+            self._show_title = entry.series_title
+        else:
+            self._media_type = MediaType.TV_SHOW
+            self._show_series_title = None
+            self._show_season = None
+            self._show_episode = None
+            self._show_title = entry.title
+
+        self._show_definition = entry.definition
+        self._show_start_dt = entry.start
+        self._show_duration = entry.duration
+        self._show_img = self.get_media_image_url(entry)
+
+    def _get_show_info(self) -> tuple:
+        """Return the show information compared to detect changes."""
+        return self.show_title, self.channel_episode, self.show_img, self.show_start_dt, self.show_duration
+
+    def _get_show_changes(self, previous: tuple, state_changed: bool = False) -> dict[str, Any]:
+        """Return the show attributes which have changed since the given show information."""
+        current_title, current_episode, current_img, current_start, current_duration = previous
+        update_data = {}
+        if current_title != self.show_title:
+            update_data[Attributes.MEDIA_TITLE] = self.show_title if self.show_title else ""
+            update_data[Attributes.MEDIA_TYPE] = self.media_type
+            update_data[OrangeSensors.SENSOR_MEDIA_TITLE] = self.show_title if self.show_title else ""
+
+        if current_episode != self.channel_episode:
+            update_data[Attributes.MEDIA_ARTIST] = self.channel_episode if self.channel_episode else ""
+            update_data[OrangeSensors.SENSOR_MEDIA_EPISODE] = self.channel_episode if self.channel_episode else ""
+
+        if current_img != self.show_img:
+            update_data[Attributes.MEDIA_TYPE] = self.media_type
+            thumbnail = artwork_cache.peek(self.show_img) if self.show_img else None
+            if thumbnail is not None:
+                self._cancel_artwork()
+                self._show_thumbnail = (self.show_img, thumbnail)
+                update_data[Attributes.MEDIA_IMAGE_URL] = thumbnail
+            elif self.show_img:
+                # Sent once the thumbnail is loaded
+                self._load_artwork(self.show_img)
             else:
-                return
+                self._cancel_artwork()
+                update_data[Attributes.MEDIA_IMAGE_URL] = ""
+        if current_duration != self.show_duration:
+            update_data[Attributes.MEDIA_DURATION] = self.show_duration
+        update_data.update(self._get_position_changes(state_changed or current_start != self.show_start_dt))
+        return update_data
+
+    def _update_position(self) -> None:
+        """Compute the position in the current show."""
+        self._show_position_at = time.time()
+        self._show_position = int(self._show_position_at) - self._show_start_dt if self._show_start_dt > 0 else 0
+
+    def _get_position_changes(self, force: bool = False) -> dict[str, Any]:
+        """Return the position attributes if forced or if the position extrapolated by the Remote has drifted.
+
+        The Remote extrapolates the position from its timestamp while playing : the position is only sent again on
+        show and state changes, or if the actual position drifts away (seek, timeshift...).
+        """
+        if not force and self._position_anchor is not None:
+            if self.state == States.PAUSED:
+                return {}
+            position, position_at = self._position_anchor
+            if self.state == States.PLAYING:
+                position += self._show_position_at - position_at
+            if abs(self.show_position - position) <= POSITION_DRIFT_THRESHOLD:
+                return {}
+        self._position_anchor = (self.show_position, self._show_position_at)
+        return {
+            Attributes.MEDIA_POSITION: self.show_position,
+            Attributes.MEDIA_POSITION_UPDATED_AT: self.position_updated_at,
+        }
 
-        await self._update_lock.acquire()
-        self._update_lock_time = time.time()
+    def _schedule_program_end(self) -> None:
+        """Schedule the switch to the next program at the end of the current one."""
+        self._cancel_program_timer()
+        delay = self._show_start_dt + self._show_duration - time.time()
+        if self._timeline is None or self._show_start_dt <= 0 or delay <= 0:
+            return
+        self._program_timer = self._event_loop.call_later(delay, self._on_program_end)
+        # Prefetch the programs of the channel if the next one is not known yet
+        if self._epg_provider.channel_requests and self._timeline.next(self._show_start_dt) is None:
+            task = self._event_loop.create_task(self._prefetch_programs(self._last_channel_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _cancel_program_timer(self) -> None:
+        if self._program_timer is not None:
+            self._program_timer.cancel()
+            self._program_timer = None
+
+    def _on_program_end(self) -> None:
+        """Switch to the next program of the cached timeline and send the show changes, without polling."""
+        self._program_timer = None
+        entry = self._timeline.current() if self._timeline is not None else None
+        if entry is None or self._channel_id != self._last_channel_id:
+            # Handled by the next poll
+            return
+        current_show = self._get_show_info()
+        self._set_program(entry)
+        self._update_position()
+        self._schedule_program_end()
+        update_data = self._get_show_changes(current_show)
+        if update_data:
+            _LOGGER.debug("[%s] Program changed: %s", self._device_config.address, self.show_title)
+            self._poll_interval.on_change()
+            self.events.emit(Events.UPDATE, self._device_config.id, update_data)
+
+    async def _prefetch_programs(self, channel_id: str) -> None:
+        """Fetch the programs of the given channel in the background, to be able to switch to the next one."""
+        # The cached programs of the channel are valid until the end of the current one : fetch them again
+        try:
+            epg_guide = await epg_cache.fetch_guide(self._epg_provider, channel_id, lambda: self.get_epg(channel_id))
+        # pylint: disable=W0718
+        except Exception as ex:
+            _LOGGER.debug("[%s] Cannot prefetch programs of %s: %s", self._device_config.address, channel_id, ex)
+            return
+        timeline = epg_guide.get(channel_id) if epg_guide is not None else None
+        if timeline is not None and channel_id == self._last_channel_id and self._timeline is not None:
+            self._timeline = timeline
+
+    async def _update(self):
+        # pylint: disable=R0914,R1702,R0915
         if self._device_config.log_client:
             _LOGGER.debug("[%s] Refresh Orange API data", self._device_config.address)
         _data = None
@@ -401,11 +559,7 @@ class OrangeTVClient:
             # If a channel is displayed
             if self._channel_id:
                 channel = self.get_channel_from_epg_id(self._channel_id)
-                current_title = self.show_title
-                current_episode = self.channel_episode
-                current_img = self.show_img
-                current_position = self.show_position
-                current_duration = self.show_duration
+                current_show = self._get_show_info()
                 current_channel = self.channel_name
 
                 # We should update all information only if channel or show change
@@ -424,6 +578,8 @@ class OrangeTVClient:
                     self._show_img = None
                     self._show_position = 0
                     self._show_start_dt = 0
+                    self._timeline = None
+                    self._cancel_program_timer()
 
                     # Get EPG information
                     channel_id = None
@@ -433,88 +589,21 @@ class OrangeTVClient:
                         pass
 
                     if channel_id and channel_id != 0:
-                        if self.country == "france":
-                            epg_data = await self._get_epg_channel_data(self._channel_id)
-                            if epg_data is not None and epg_data[self._channel_id]:
-                                # Show title depending of programType and current time
-                                entry = self._find_epg_entry(epg_data[self._channel_id], False)
-
-                                if entry["programType"] == "EPISODE":
-                                    self._media_type = MediaType.VIDEO
-                                    self._show_series_title = entry["title"]
-                                    self._show_season = entry["season"]["number"]
-                                    if entry.get("episodeNumber", None):
-                                        self._show_episode = entry["episodeNumber"]
-                                    else:
-                                        self._show_episode = 0
-                                    self._show_title = entry["season"]["serie"]["title"]
-                                else:
-                                    self._media_type = MediaType.TV_SHOW
-                                    self._show_title = entry["title"]
-
-                                self._show_definition = entry["definition"]
-                                self._show_start_dt = entry["diffusionDate"]
-                                self._show_duration = entry["duration"]
-                                image = self.get_media_image_url(entry)
-                                if image is not None:
-                                    self._show_img = image
-                        elif self.country == "poland":
-                            _data2 = await self.get_epg(self._channel_id)
-                            if _data2 is not None:
-                                for epg in _data2.get("epg", None):
-                                    if self._channel_id in epg.get("channelExternalId", None):
-                                        schedules = epg.get("schedule", None)
-                                        for sch in schedules:
-                                            d = datetime.datetime.now(datetime.UTC)
-                                            if (
-                                                sch.get("startDate", None)
-                                                <= calendar.timegm(d.utctimetuple())
-                                                <= sch.get("endDate", None)
-                                            ):
-                                                self._show_start_dt = sch.get("startDate", None)
-                                                self._show_duration = sch.get("endDate", None) - sch.get(
-                                                    "startDate", None
-                                                )
-
-                                                if sch.get("isSeries", False):
-                                                    self._media_type = MediaType.VIDEO
-                                                    self._show_series_title = sch.get("name", None)
-                                                    self._show_episode = sch.get("episodeNumber", None)
-                                                    # self._show_title = sch.get("name", None)
-                                                else:
-                                                    self._media_type = MediaType.TV_SHOW
-                                                    self._show_title = sch.get("name", None)
-                                                image = self.get_media_image_url(sch)
-                                                if image:
-                                                    self._show_img = image
-                                                break
-
-                                            # update position if we have show information
-
+                        epg_guide = await self._get_epg_channel_guide(self._channel_id)
+                        timeline = epg_guide.get(self._channel_id) if epg_guide is not None else None
+                        if timeline:
+                            # Show title depending of programType and current time
+                            self._set_program(self._find_epg_entry(timeline, False))
+                            self._timeline = timeline
+                            self._schedule_program_end()
+
+                # update position if we have show information
                 if self._show_start_dt > 0:
-                    d = datetime.datetime.now(datetime.UTC)
-                    self._show_position = calendar.timegm(d.utctimetuple()) - self._show_start_dt
+                    self._update_position()
 
                 if current_state != self.state:
                     update_data[Attributes.STATE] = self.state
-                if current_title != self.show_title:
-                    update_data[Attributes.MEDIA_TITLE] = self.show_title if self.show_title else ""
-                    update_data[Attributes.MEDIA_TYPE] = self.media_type
-                    update_data[OrangeSensors.SENSOR_MEDIA_TITLE] = self.show_title if self.show_title else ""
-
-                if current_episode != self.channel_episode:
-                    update_data[Attributes.MEDIA_ARTIST] = self.channel_episode if self.channel_episode else ""
-                    update_data[OrangeSensors.SENSOR_MEDIA_EPISODE] = (
-                        self.channel_episode if self.channel_episode else ""
-                    )
-
-                if current_img != self.show_img:
-                    update_data[Attributes.MEDIA_IMAGE_URL] = self.show_img if self.show_img else ""
-                    update_data[Attributes.MEDIA_TYPE] = self.media_type
-                if current_position != self.show_position:
-                    update_data[Attributes.MEDIA_POSITION] = self.show_position
-                if current_duration != self.show_duration:
-                    update_data[Attributes.MEDIA_DURATION] = self.show_duration
+                update_data.update(self._get_show_changes(current_show, current_state != self.state))
                 if current_channel != self.channel_name:
                     update_data[Attributes.SOURCE] = self.channel_name if self.channel_name else ""
                     update_data[OrangeSensors.SENSOR_CHANNEL] = self.channel_name if self.channel_name else ""
@@ -523,6 +612,8 @@ class OrangeTVClient:
                     }
 
                 if update_data:
+                    if update_data.keys() - POSITION_ATTRIBUTES:
+                        self._poll_interval.on_change()
                     self.events.emit(Events.UPDATE, self._device_config.id, update_data)
 
             else:
@@ -540,8 +631,9 @@ class OrangeTVClient:
                 self._show_img = None
                 self._show_start_dt = 0
                 self._show_duration = 0
-                self._show_position = 0
+                self._update_position()
                 if current_state != self.state:
+                    self._poll_interval.on_change()
                     update_data[Attributes.STATE] = self.state
                     self.events.emit(
                         Events.UPDATE,
@@ -551,7 +643,7 @@ class OrangeTVClient:
                             Attributes.MEDIA_IMAGE_URL: "",
                             Attributes.MEDIA_TITLE: "",
                             Attributes.MEDIA_ARTIST: "",
-                            Attributes.MEDIA_POSITION: 0,
+                            **self._get_position_changes(True),
                             Attributes.MEDIA_DURATION: 0,
                             Attributes.MEDIA_TYPE: MediaType.TV_SHOW,
                             Attributes.STATE: self.state,
@@ -564,7 +656,6 @@ class OrangeTVClient:
         # pylint: disable=W0718
         except Exception as ex:
             _LOGGER.error("[%s] Error during update %s", self._device_config.address, ex)
-        self._update_lock.release()
         return _data
 
     @property
@@ -580,10 +671,11 @@ class OrangeTVClient:
             Attributes.SOURCE_LIST: self.channel_names,
             Attributes.SOURCE: self.channel_name if self.channel_name else "",
             Attributes.MEDIA_TYPE: self.media_type,
-            Attributes.MEDIA_IMAGE_URL: self.show_img if self.show_img else "",
+            Attributes.MEDIA_IMAGE_URL: self.media_image_url,
             Attributes.MEDIA_TITLE: self.show_title if self.show_title else "",
             Attributes.MEDIA_ARTIST: self.channel_episode if self.channel_episode else "",
             Attributes.MEDIA_POSITION: self.show_position,
+            Attributes.MEDIA_POSITION_UPDATED_AT: self.position_updated_at,
             Attributes.MEDIA_DURATION: self.show_duration,
             OrangeSensors.SENSOR_CHANNEL: self.channel_name,
             OrangeSensors.SENSOR_MEDIA_TITLE: self.show_title,
@@ -662,12 +754,9 @@ class OrangeTVClient:
         await self.set_channel_by_name(value)
 
     @property
-    def channel_names(self):
+    def channel_names(self) -> tuple[str, ...]:
         """List of channel names."""
-        channel_names = []
-        for channel in self.channels:
-            channel_names.append(channel.get("name"))
-        return channel_names
+        return self._channel_index.names
 
     @property
     def show_title(self):
@@ -708,6 +797,13 @@ class OrangeTVClient:
         """Current show picture."""
         return self._show_img
 
+    @property
+    def media_image_url(self) -> str:
+        """Current show thumbnail as data URI if loaded, else its picture URL."""
+        if self._show_thumbnail is not None and self._show_thumbnail[0] == self.show_img:
+            return self._show_thumbnail[1]
+        return self.show_img if self.show_img else ""
+
     @property
     def show_start_dt(self):
         """Current show current time timestamp."""
@@ -723,6 +819,13 @@ class OrangeTVClient:
         """Current show position."""
         return self._show_position
 
+    @property
+    def position_updated_at(self) -> str:
+        """Timestamp of the current show position in ISO 8601 format."""
+        if not self._show_position_at:
+            return ""
+        return datetime.datetime.fromtimestamp(self._show_position_at, datetime.timezone.utc).isoformat()
+
     @property
     def is_on(self) -> bool:
         """Device is on."""
@@ -827,7 +930,7 @@ class OrangeTVClient:
 
     def get_channel_names(self, json_output=False):
         """Get channel names."""
-        channels = [x["name"] for x in self.channels]
+        channels = self._channel_index.names
         return json.dumps(channels) if json_output else channels
 
     def get_channel_info(self, channel):
@@ -837,16 +940,14 @@ class OrangeTVClient:
         if channel.startswith("."):
             channel_index = channel.split(".")[1]
         # Look for an exact match first
-        for chan in self.channels:
-            if channel_index:
-                if chan["index"] == channel_index:
-                    return chan
-            else:
-                if chan["name"].lower() == channel.lower():
-                    return chan
+        if channel_index:
+            chan = self._channel_index.by_index(channel_index)
+        else:
+            chan = self._channel_index.by_name(channel)
+        if chan:
+            return chan
         # Try fuzzy matching it that did not give any result
-        chan = process.extractOne(channel, self.channels)[0]
-        return chan
+        return self._channel_index.match(channel)
 
     def get_channel_id_from_name(self, channel):
         """Get channel id from name."""
@@ -854,8 +955,7 @@ class OrangeTVClient:
 
     def get_channel_from_epg_id(self, epg_id):
         """Get channel from EPG id."""
-        res = [c for c in self.channels if c["epg_id"] == epg_id]
-        return res[0] if res else None
+        return self._channel_index.by_epg_id(epg_id)
 
     async def set_channel_by_id(self, epg_id):
         """Set channel from EPD id."""
@@ -879,7 +979,14 @@ class OrangeTVClient:
         return await self.set_channel_by_id(epg_id)
 
     async def rq_livebox(self, operation, params=None):
-        """Send HTTP request to the livebox."""
+        """Send HTTP request to the livebox, concurrent read-only requests are shared."""
+        if operation in COALESCED_OPERATIONS:
+            key = (operation, tuple(params.items()) if params else None, self._command_generation)
+            return await self._requests.do(key, lambda: self._rq_livebox(operation, params))
+        self._command_generation += 1
+        return await self._rq_livebox(operation, params)
+
+    async def _rq_livebox(self, operation, params=None):
         url = f"http://{self.hostname}:{self.port}/remoteControl/cmd"
         get_params = OrderedDict({"operation": operation})
         if self._device_config.log_client:
@@ -888,7 +995,9 @@ class OrangeTVClient:
             get_params.update(params)
         try:
             await self.check_session()
-            async with self._session.get(url, params=get_params) as r:
+            async with self._session.get(
+                url, params=get_params, headers=self._headers, timeout=self._request_timeout
+            ) as r:
                 results = await r.json()
                 if self._device_config.log_client:
                     _LOGGER.debug("[%s] Livebox response: %s", self._device_config.address, results)
@@ -898,7 +1007,9 @@ class OrangeTVClient:
                 _LOGGER.warning("[%s] OS error, waiting %ss", self._device_config.address, ERROR_OS_WAIT)
                 try:
                     await asyncio.sleep(ERROR_OS_WAIT)
-                    async with self._session.get(url, params=get_params) as r:
+                    async with self._session.get(
+                        url, params=get_params, headers=self._headers, timeout=self._request_timeout
+                    ) as r:
                         results = await r.json()
                         if self._device_config.log_client:
                             _LOGGER.debug("[%s] Livebox response: %s", self._device_config.address, results)
@@ -910,22 +1021,24 @@ class OrangeTVClient:
                 self._display_con_err = False
                 _LOGGER.error("Livebox request error : %s", ex)
 
-    async def get_epg(self, channel_id: str = None) -> dict[str, list[dict[str, Any]]] | None:
-        """Request to EPG by channel ID."""
-        get_params = None
-        if self.country == "france":
-            get_params = OrderedDict({"groupBy": "channel", "period": "current"})
-            if channel_id:
-                get_params["epgIds"] = channel_id
-            get_params["mco"] = "OFR"
-        elif self.country == "poland":
-            get_params = OrderedDict({"hhTech": "", "deviceCat": "otg"})
+    async def get_epg(self, channel_id: str = None) -> EpgData | None:
+        """Request to EPG by channel ID, concurrent requests of all the clients are shared."""
+        return await _epg_requests.do((self.epg_url, channel_id), lambda: self._get_epg(channel_id))
+
+    async def _get_epg(self, channel_id: str = None) -> EpgData | None:
+        get_params = self._epg_provider.request_params(channel_id)
         if self._device_config.log_client:
             _LOGGER.debug("[%s] Request EPG channel id %s", self._device_config.address, channel_id)
         try:
             await self.check_session()
-            async with self._session.get(self.epg_url, params=get_params, ssl=self._sslcontext) as r:
-                results = await r.json()
+            async with self._session.get(
+                self.epg_url,
+                params=get_params,
+                headers=self._headers,
+                timeout=self._request_timeout,
+                ssl=session_manager.ssl_context,
+            ) as r:
+                results = await self._epg_provider.parse(r.content.iter_chunked(EPG_STREAM_CHUNK_SIZE))
                 if self._device_config.log_client:
                     _LOGGER.debug("[%s] EPG response: %s", self._device_config.address, results)
                 return results
@@ -934,96 +1047,132 @@ class OrangeTVClient:
             _LOGGER.exception("[%s] EPG response: %s", self._device_config.address, errh, exc_info=True, stacklevel=50)
             return None
 
+    @staticmethod
+    def _get_page_bounds(paging: Pagination, offset: int = 0) -> tuple[int, int]:
+        """Return the slice bounds of the requested page, after the given number of leading items."""
+        start = (paging.page - 1) * paging.limit - offset
+        return max(start, 0), max(start + paging.limit, 0)
+
+    @staticmethod
+    def _get_page_expiry(timelines: Sequence[EpgTimeline], now: float) -> float:
+        """Return the time until which a page of the given channels is valid : end of the first ending program."""
+        expires = now + BROWSE_PAGE_TTL
+        for timeline in timelines:
+            end = timeline.end_at(now)
+            if end is not None:
+                expires = min(expires, end)
+        return expires
+
     async def get_filtered_entries(
-        self, epg_data: dict[str, list[dict[str, Any]]], paging: Pagination, parent_path: str | None = None
+        self, timelines: Sequence[EpgTimeline], parent_path: str | None = None
     ) -> list[BrowseMediaItem]:
-        """Return filtered entries from pagination."""
-        limit = paging.limit
-        start = (paging.page - 1) * limit
-        index = 0
+        """Return the entries of the current programs of the given channels."""
         result: list[BrowseMediaItem] = []
-        for channel_epg in epg_data.values():
-            if index < start:
-                index += 1
-                continue
-            if index > start + limit:
-                break
-            index += 1
+        for channel_epg in timelines:
             epg_entry = self._find_epg_entry(channel_epg, True)
             if not epg_entry:
                 epg_entry = self._find_epg_entry(channel_epg, False)
-                self._epg_data_timestamp = 0
+                epg_cache.invalidate(self.country)
             if not epg_entry:
                 continue
-            channel = self.get_channel_from_epg_id(epg_entry.get("channelId", ""))
-            channel = channel.get("name", "") if channel else epg_entry.get("channelId", "")
-
-            title = f"{channel if channel else ''} - {epg_entry.get('title', '')}"
-            subtitle = epg_entry.get("synopsis", "")
-            if parent_path is None:
-                media_id = epg_entry.get("channelId", "0")
-            else:
-                media_id = parent_path + "/" + epg_entry.get("channelId", "0")
             result.append(
-                BrowseMediaItem(
-                    media_id=media_id,
-                    title=title,
-                    subtitle=subtitle,
-                    media_type=MediaType.VIDEO,
-                    media_class=MediaClass.VIDEO,
-                    can_browse=True,
-                    can_search=True,
-                    thumbnail=self.get_media_image_url(epg_entry),
+                browse_cache.get_item(
+                    epg_entry, parent_path, lambda program: self._render_channel_item(program, parent_path)
                 )
             )
         return result
 
+    def _render_channel_item(self, program: Program, parent_path: str | None) -> BrowseMediaItem:
+        """Render the browse entry of a channel from its current program."""
+        channel_id = program.channel_id or ""
+        channel = self.get_channel_from_epg_id(channel_id)
+        channel = channel.get("name", "") if channel else channel_id
+
+        title = f"{channel if channel else ''} - {program.title or ''}"
+        if parent_path is None:
+            media_id = channel_id or "0"
+        else:
+            media_id = parent_path + "/" + (channel_id or "0")
+        return BrowseMediaItem(
+            media_id=media_id,
+            title=title,
+            subtitle=self._get_program_subtitle(program),
+            media_type=MediaType.VIDEO,
+            media_class=MediaClass.VIDEO,
+            can_browse=True,
+            can_search=True,
+            thumbnail=self.get_media_image_url(program),
+        )
+
+    def _render_program_item(self, program: Program, media_id: str) -> BrowseMediaItem:
+        """Render the browse entry of a program of a channel."""
+        show_start = datetime.datetime.fromtimestamp(program.start, self._timezone)
+        return BrowseMediaItem(
+            media_id=media_id,
+            title=f"{show_start.strftime('%H:%M')} - {program.title or ''}",
+            subtitle=self._get_program_subtitle(program),
+            media_type=MediaType.CHANNEL.value,
+            media_class=MediaClass.CHANNEL.value,
+            can_play=True,
+            can_browse=False,
+            can_search=True,
+            thumbnail=self.get_media_image_url(program),
+            duration=program.duration,
+        )
+
     @staticmethod
-    def get_genres_from_epg(epg_data: dict[str, list[dict[str, Any]]]) -> set[str]:
-        """Extract genres from epg data."""
-        genres: set[str] = set()
-        for epg_entry in epg_data.values():
-            for sub_entry in epg_entry:
-                genres.add(sub_entry.get("genre", ""))
-        return genres
-
-    def get_epg_from_genre(
-        self, epg_data: dict[str, list[dict[str, Any]]], genre: str
-    ) -> dict[str, list[dict[str, Any]]]:
-        """Return matching epg entries from given genre."""
-        results: dict[str, list[dict[str, Any]]] = {}
-        for channel_id, epg_channel in epg_data.items():
-            epg_entry = self._find_epg_entry(epg_channel, False)
-            if epg_entry is None:
-                continue
-            if epg_entry.get("genre", "") == genre:
-                results[channel_id] = epg_channel
-        return results
+    def _get_program_subtitle(program: Program) -> str:
+        """Return the browse subtitle of the program : series and episode, or genre."""
+        if program.is_episode:
+            episode = f"E{program.episode}" if program.season is None else f"S{program.season}E{program.episode}"
+            return f"{program.series_title} {episode}".strip()
+        return program.genre or ""
+
+    @staticmethod
+    def get_genres_from_epg(epg_data: EpgGuide) -> list[str]:
+        """Extract sorted genres from epg data."""
+        return epg_data.genre_index.genres()
+
+    @staticmethod
+    def get_epg_from_genre(epg_data: EpgGuide, genre: str) -> TimelineView:
+        """Return matching epg entries from given genre, in channels order."""
+        return epg_data.channels_of_genre(genre)
 
-    # pylint: disable=R0911
     async def browse_media(
         self, media_id: str | None, media_type: str | None, paging: PagingOptions | None
     ) -> tuple[BrowseMediaItem, Pagination] | None:
-        """Browse media."""
-        # pylint: disable=R0914
+        """Browse media, built pages are cached per EPG version until one of their programs ends."""
         _LOGGER.debug("[%s] Browse media: %s %s %s", self._device_config.address, media_id, media_type, paging)
-        if self._epg_data is None or self._epg_data_timestamp < time.time() - EPG_REFRESH:
-            self._epg_data = await self.get_epg()
-            self._epg_data_timestamp = time.time()
-        try:
-            if paging is None:
-                paging = Pagination(page=1, limit=10, count=0)
-            else:
-                paging = Pagination(page=paging.page, limit=paging.limit, count=0)
-
-            if media_id == "" or media_id is None:
-                media_id = "orange://channels"
+        epg_data = await self._get_epg_guide(allow_stale=True)
+        if epg_data is None:
+            _LOGGER.warning("[%s] No EPG data available to browse media", self._device_config.address)
+            return None
+        if paging is None:
+            paging = Pagination(page=1, limit=10, count=0)
+        else:
+            paging = Pagination(page=paging.page, limit=paging.limit, count=0)
+        if media_id == "" or media_id is None:
+            media_id = "orange://channels"
+
+        now = time.time()
+        key = (self.country, media_id, media_type, paging.page, paging.limit, epg_data.version)
+        cached = browse_cache.get_page(key, now)
+        if cached is not None:
+            return cached
+        page = await self._browse_page(epg_data, media_id, media_type, paging, now)
+        if page is None:
+            return None
+        browse_cache.set_page(key, *page)
+        return page[1], page[2]
 
+    # pylint: disable=R0911
+    async def _browse_page(
+        self, epg_data: EpgGuide, media_id: str, media_type: str | None, paging: Pagination, now: float
+    ) -> tuple[float, BrowseMediaItem, Pagination] | None:
+        # pylint: disable=R0914,R0917
+        try:
             if media_id == "orange://genres":
-                limit = paging.limit
-                start = (paging.page - 1) * limit
-                index = 0
-                genres = OrangeTVClient.get_genres_from_epg(self._epg_data)
+                genres = OrangeTVClient.get_genres_from_epg(epg_data)
                 result = BrowseMediaItem(
                     media_id="orange://genres",
                     title="Genres",
@@ -1034,13 +1183,8 @@ class OrangeTVClient:
                     items=[],
                 )
 
-                for genre in genres:
-                    if index < start:
-                        index += 1
-                        continue
-                    if index > start + limit:
-                        break
-                    index += 1
+                start, end = self._get_page_bounds(paging)
+                for genre in genres[start:end]:
                     result.items.append(
                         BrowseMediaItem(
                             media_id=genre,
@@ -1054,7 +1198,7 @@ class OrangeTVClient:
                 paging.count = len(genres)
                 if paging.page == 1:
                     paging.count += 1
-                return result, paging
+                return now + BROWSE_PAGE_TTL, result, paging
 
             if media_id == "orange://channels":
                 result = BrowseMediaItem(
@@ -1066,8 +1210,8 @@ class OrangeTVClient:
                     can_search=True,
                     items=[],
                 )
+                # The first page starts with the genres entry
                 if paging.page == 1:
-                    paging.limit -= 1
                     result.items.append(
                         BrowseMediaItem(
                             media_id="orange://genres",
@@ -1079,11 +1223,11 @@ class OrangeTVClient:
                         ),
                     )
 
-                result.items.extend(await self.get_filtered_entries(self._epg_data, paging))
-                paging.count = len(self._epg_data.keys())
-                if paging.page == 1:
-                    paging.count += 1
-                return result, paging
+                start, end = self._get_page_bounds(paging, 1)
+                timelines = epg_data.channels()[start:end]
+                result.items.extend(await self.get_filtered_entries(timelines))
+                paging.count = len(epg_data) + 1
+                return self._get_page_expiry(timelines, now), result, paging
 
             if media_type == "genre":
                 if "/" in media_id:
@@ -1100,12 +1244,14 @@ class OrangeTVClient:
                     items=[],
                 )
 
-                epg_channels = self.get_epg_from_genre(self._epg_data, genre)
-                result.items.extend(await self.get_filtered_entries(epg_channels, paging, f"orange://genres/{genre}"))
-                paging.count = len(epg_channels.keys())
+                epg_channels = self.get_epg_from_genre(epg_data, genre)
+                start, end = self._get_page_bounds(paging)
+                timelines = epg_channels[start:end]
+                result.items.extend(await self.get_filtered_entries(timelines, f"orange://genres/{genre}"))
+                paging.count = len(epg_channels)
                 if paging.page == 1:
                     paging.count += 1
-                return result, paging
+                return self._get_page_expiry(timelines, now), result, paging
 
             # Else channel id
             parent_id = "orange://channels"
@@ -1119,10 +1265,11 @@ class OrangeTVClient:
             else:
                 channel_id = media_id
 
-            epg_channel = self._epg_data.get(channel_id, None)
+            epg_channel = epg_data.get(channel_id)
             if epg_channel is None:
                 paging.count = 1
                 return (
+                    now + BROWSE_PAGE_TTL,
                     BrowseMediaItem(
                         media_id=parent_id,
                         title="..",
@@ -1137,7 +1284,7 @@ class OrangeTVClient:
             channel = self.get_channel_from_epg_id(channel_id)
             result = BrowseMediaItem(
                 media_id=channel_id,
-                title=channel.get("name"),
+                title=channel.get("name", channel_id) if channel else channel_id,
                 media_type=MediaType.CHANNEL.value,
                 media_class=MediaClass.CHANNEL.value,
                 can_browse=True,
@@ -1145,31 +1292,15 @@ class OrangeTVClient:
                 items=[],
             )
 
-            for epg_entry in epg_channel:
-                title = epg_entry.get("title", "")
-                show_start_dt = epg_entry["diffusionDate"]
-                show_duration = epg_entry["duration"]
-                show_start = datetime.datetime.fromtimestamp(show_start_dt, self._timezone)
-                # show_end = show_start + datetime.timedelta(0, show_duration)
-                # position = show_end.timestamp() - show_start.timestamp()
-                title = f"{show_start.strftime('%H:%M')} - {title}"
-                subtitle = epg_entry.get("synopsis", "")
+            start, end = self._get_page_bounds(paging)
+            for epg_entry in epg_channel.entries[start:end]:
                 result.items.append(
-                    BrowseMediaItem(
-                        media_id=media_id,
-                        title=title,
-                        subtitle=subtitle,
-                        media_type=MediaType.CHANNEL.value,
-                        media_class=MediaClass.CHANNEL.value,
-                        can_play=True,
-                        can_browse=False,
-                        can_search=True,
-                        thumbnail=self.get_media_image_url(epg_entry),
-                        duration=show_duration,
+                    browse_cache.get_item(
+                        epg_entry, ("program", media_id), lambda program: self._render_program_item(program, media_id)
                     )
                 )
             paging.count = len(epg_channel)
-            return result, paging
+            return now + BROWSE_PAGE_TTL, result, paging
         # pylint: disable=W0718
         except Exception as ex:
             _LOGGER.exception(
@@ -0,0 +1,49 @@
+"""
+Request coalescing of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class SingleFlight:
+    """Share in-flight requests between concurrent callers of the same key.
+
+    The first caller of a key starts the request in its own task, the callers arriving before it completes wait for
+    the same task and get the same result or exception. Cancelling a caller does not cancel the shared request.
+    """
+
+    def __init__(self):
+        """Create the single-flight group."""
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return true if a request of the given key is in flight."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Run the given request unless a request of the same key is already in flight, and return its result."""
+        task = self._inflight.get(key, None)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(request())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        else:
+            _LOGGER.debug("Joining in-flight request %s", key)
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget the completed request of the given key."""
+        if self._inflight.get(key, None) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved if all the callers have been cancelled
+            task.exception()
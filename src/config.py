@@ -14,7 +14,12 @@ from typing import Callable, Iterator
 
 from ucapi import Entity, EntityTypes
 
-from const import DEFAULT_COUNTRY, DEFAULT_PORT
+from const import (
+    DEFAULT_COUNTRY,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    DEFAULT_PORT,
+)
 
 _LOG = logging.getLogger(__name__)
 
@@ -47,6 +52,8 @@ class OrangeConfigDevice:
     always_on: bool = field(default=False)
     log_client: bool = field(default=False)
     sensor_include_device_name: bool = field(default=True)
+    poll_min_interval: float = field(default=DEFAULT_POLL_MIN_INTERVAL)
+    poll_max_interval: float = field(default=DEFAULT_POLL_MAX_INTERVAL)
 
     def __post_init__(self):
         """Apply default values on missing fields."""
@@ -138,6 +145,8 @@ class Devices:
                 item.country = device_instance.country
                 item.always_on = device_instance.always_on
                 item.log_client = device_instance.log_client
+                item.poll_min_interval = device_instance.poll_min_interval
+                item.poll_max_interval = device_instance.poll_max_interval
                 return self.store()
         return False
 
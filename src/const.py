@@ -35,6 +35,8 @@ DEFAULT_NAME = "liveboxtvuhd"
 DEFAULT_PORT = 8080
 CONF_COUNTRY = "country"
 DEFAULT_COUNTRY = "france"
+DEFAULT_POLL_MIN_INTERVAL = 2
+DEFAULT_POLL_MAX_INTERVAL = 60
 
 
 # Livebox operation
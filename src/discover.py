@@ -6,8 +6,21 @@ import asyncio
 import logging
 import re
 import socket
+import struct
+import time
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 from urllib.parse import urlparse
 
 import httpx
@@ -15,6 +28,9 @@ import httpx
 # import netifaces
 from defusedxml import DefusedXmlException
 from defusedxml.ElementTree import ParseError, fromstring
+from pyee.asyncio import AsyncIOEventEmitter
+
+from coalesce import SingleFlight
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +45,9 @@ SSDP_ST_3 = "urn:schemas-upnp-org:device:MediaRenderer:1"
 SSDP_ST_LIST = (SSDP_ST_1, SSDP_ST_2, SSDP_ST_3)
 
 SSDP_LOCATION_PATTERN = re.compile(r"(?<=LOCATION:\s).+?(?=\r)")
+SSDP_MAX_AGE_PATTERN = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+SSDP_DEFAULT_MAX_AGE = 1800
+SSDP_ADDRESS_CHANGED = "address_changed"
 
 SCPD_XMLNS = "{urn:schemas-upnp-org:device-1-0}"
 SCPD_DEVICE = f"{SCPD_XMLNS}device"
@@ -47,6 +66,11 @@ SUPPORTED_DEVICETYPES = [
 
 SUPPORTED_MANUFACTURERS = ["SoftAtHome", "SAGEM"]
 
+SCPD_TIMEOUT = 5.0
+SCPD_MAX_CONCURRENCY = 8
+
+DISCOVERY_TIMEOUT = SSDP_MX + SCPD_TIMEOUT
+
 
 def ssdp_request(ssdp_st: str, ssdp_mx: float = SSDP_MX) -> bytes:
     """Return request bytes for given st and mx."""
@@ -82,79 +106,177 @@ async def async_identify_orangetv_devices() -> List[Dict]:
     Returns a list of dictionaries which includes all discovered Livebox
     devices with keys "host", "modelName", "friendlyName", "presentationURL".
     """
-    # Sending SSDP broadcast message to get resource urls from devices
-    urls = await async_send_ssdp_broadcast()
+    return [device async for device in async_discover_orangetv_devices()]
 
-    # Check which responding device is a Orange TV device and prepare output
-    devices = []
 
-    for url in urls:
-        try:
-            async with httpx.AsyncClient() as client:
-                res = await client.get(url, timeout=5.0)
-                res.raise_for_status()
-        except httpx.HTTPError:
-            continue
-        else:
-            device = evaluate_scpd_xml(url, res.text)
-            if device is not None:
-                devices.append(device)
-
-    return devices
+async def async_discover_orangetv_devices(
+    timeout: float = DISCOVERY_TIMEOUT, rescan: bool = True
+) -> AsyncIterator[Dict]:
+    """
+    Discover Livebox using SSDP and SCPD queries, yielding each device as soon as identified.
 
+    The devices already announced on the network are yielded first. The network is then searched for the devices not
+    announced yet, until the SSDP responses delayed up to SSDP_MX seconds by the devices have been processed.
 
-async def async_send_ssdp_broadcast() -> Set[str]:
+    :param timeout: overall deadline of the discovery in seconds
+    :param rescan: if not set, the network is only searched if no device has been announced
     """
-    Send SSDP broadcast messages to discover UPnP devices.
+    # Answer first from the devices announced on the network, then search for the ones not announced yet
+    devices = ssdp_listener.devices()
+    if devices:
+        _LOGGER.debug("Discovered devices from SSDP announcements: %s", devices)
+    hosts = set()
+    for device in devices:
+        # The same device may be announced under several UDNs (root and embedded devices)
+        if device["host"] in hosts:
+            continue
+        hosts.add(device["host"])
+        yield device
+    if hosts and not rescan:
+        return
 
-    Returns a set of SCPD XML resource urls for all discovered devices.
-    """
-    # Send up to three different broadcast messages
-    ips = get_local_ips()
-    # Prepare output of responding devices
-    urls = set()
+    async def locations() -> AsyncIterator[str]:
+        async for url in async_iter_ssdp_locations(SSDP_MX):
+            if urlparse(url).hostname not in hosts:
+                yield url
 
-    tasks = []
-    for ip_addr in ips:
-        tasks.append(async_send_ssdp_broadcast_ip(ip_addr))
-    tasks.append(async_send_ssdp_broadcast_ip(""))
-    results = await asyncio.gather(*tasks)
+    async for device in async_identify_devices(locations(), timeout):
+        if device["host"] not in hosts:
+            hosts.add(device["host"])
+            yield device
 
-    for result in results:
-        _LOGGER.debug("SSDP broadcast result received: %s", result)
-        urls = urls.union(result)
 
-    _LOGGER.debug("Following devices found: %s", urls)
-    return urls
+async def async_identify_devices(
+    urls: Iterable[str] | AsyncIterable[str], timeout: Optional[float] = None
+) -> AsyncIterator[Dict]:
+    """
+    Identify Orange TV devices from their SCPD XML resource urls.
 
+    The urls are processed as they are received, the hosts being queried concurrently over a shared HTTP client, up to
+    SCPD_MAX_CONCURRENCY at a time. The urls of a same host are tried in turn until the device is identified.
+    Devices are yielded as soon as identified.
 
-async def async_send_ssdp_broadcast_ip(ip_addr: str) -> Set[str]:
-    """Send SSDP broadcast messages to a single IP."""
-    try:
-        # Ignore 169.254.0.0/16 addresses
-        if ip_addr.startswith("169.254."):
-            return set()
+    :param urls: SCPD XML resource urls
+    :param timeout: overall deadline in seconds, no deadline if not set
+    """
+    # pylint: disable=R0914
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    semaphore = asyncio.Semaphore(SCPD_MAX_CONCURRENCY)
+    # Urls left to try per host being queried, identified hosts
+    pending: Dict[str, List[str]] = {}
+    identified: Set[str] = set()
+    # Every task ends by posting its result : a device, or None
+    results: asyncio.Queue[Optional[Dict]] = asyncio.Queue()
+    tasks: Set[asyncio.Task] = set()
+
+    async def probe(host: str) -> None:
+        device = None
+        try:
+            async with semaphore:
+                while pending[host] and device is None:
+                    device = await async_fetch_device(client, pending[host].pop(0))
+            if device is not None:
+                identified.add(host)
+        finally:
+            del pending[host]
+            results.put_nowait(device)
 
-        # Prepare socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        sock.bind((ip_addr, 0))
+    async def feed() -> None:
+        try:
+            async for url in _aiter(urls):
+                host = urlparse(url).hostname or url
+                if host in identified:
+                    continue
+                if host in pending:
+                    pending[host].append(url)
+                    continue
+                pending[host] = [url]
+                tasks.add(asyncio.create_task(probe(host)))
+        finally:
+            results.put_nowait(None)
+
+    limits = httpx.Limits(max_connections=SCPD_MAX_CONCURRENCY)
+    async with httpx.AsyncClient(timeout=SCPD_TIMEOUT, limits=limits) as client:
+        tasks.add(asyncio.create_task(feed()))
+        try:
+            # The feeder posts its result after having created all the probes
+            received = 0
+            while received < len(tasks):
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    _LOGGER.debug("Discovery deadline reached")
+                    break
+                try:
+                    device = await asyncio.wait_for(results.get(), remaining)
+                except asyncio.TimeoutError:
+                    continue
+                received += 1
+                if device is not None:
+                    yield device
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def async_fetch_device(client: httpx.AsyncClient, url: str) -> Optional[Dict]:
+    """Fetch the given SCPD XML resource and return the Orange TV device it describes, if any."""
+    try:
+        res = await client.get(url)
+        res.raise_for_status()
+    except (httpx.HTTPError, httpx.InvalidURL) as err:
+        _LOGGER.debug("Cannot fetch SCPD XML from URI %s: %s", url, err)
+        return None
+    return evaluate_scpd_xml(url, res.text)
 
-        # Get asyncio loop
-        loop = asyncio.get_event_loop()
-        transport, protocol = await loop.create_datagram_endpoint(OrangeTVSSDP, sock=sock)
 
-        # Wait for the timeout period
-        await asyncio.sleep(SSDP_MX)
+async def _aiter(items: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    """Iterate asynchronously over the given items."""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
 
-        # Close the connection
-        transport.close()
 
-        _LOGGER.debug("Got %s results after SSDP queries using ip %s", len(protocol.urls), ip_addr)
+async def async_iter_ssdp_locations(timeout: float = SSDP_MX) -> AsyncIterator[str]:
+    """
+    Send SSDP broadcast messages on all the local interfaces to discover UPnP devices.
 
-        return protocol.urls
-    # pylint: disable = W0718
-    except Exception:
-        return set()
+    Yields the SCPD XML resource url of each responding device as soon as received, until the given timeout.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    locations: asyncio.Queue[str] = asyncio.Queue()
+    transports = []
+    try:
+        for ip_addr in get_local_ips() + [""]:
+            # Ignore 169.254.0.0/16 addresses
+            if ip_addr.startswith("169.254."):
+                continue
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+                sock.bind((ip_addr, 0))
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: OrangeTVSSDP(locations.put_nowait), sock=sock
+                )
+                transports.append(transport)
+            except OSError as err:
+                _LOGGER.debug("Cannot send SSDP queries using ip %s: %s", ip_addr, err)
+        urls = set()
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                url = await asyncio.wait_for(locations.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if url not in urls:
+                urls.add(url)
+                yield url
+    finally:
+        for transport in transports:
+            transport.close()
 
 
 def evaluate_scpd_xml(url: str, body: str) -> Optional[Dict]:
@@ -213,9 +335,9 @@ def evaluate_scpd_xml(url: str, body: str) -> Optional[Dict]:
 class OrangeTVSSDP(asyncio.DatagramProtocol):
     """Implements datagram protocol for SSDP discovery of Orange TV devices."""
 
-    def __init__(self) -> None:
-        """Create instance."""
-        self.urls = set()
+    def __init__(self, on_location: Callable[[str], None]) -> None:
+        """Create instance, the given callback being called with each received location."""
+        self._on_location = on_location
 
     def connection_made(self, transport: asyncio.DatagramTransport) -> None:
         """Send SSDP request when connection was made."""
@@ -233,4 +355,169 @@ class OrangeTVSSDP(asyncio.DatagramProtocol):
         data_text = data.decode("utf-8")
         match = SSDP_LOCATION_PATTERN.search(data_text)
         if match:
-            self.urls.add(match.group(0))
+            self._on_location(match.group(0))
+
+
+def parse_ssdp_headers(data: bytes) -> Tuple[str, Dict[str, str]]:
+    """Return the start line and the headers (with upper case names) of the given SSDP message."""
+    lines = data.decode("utf-8", errors="replace").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().upper()] = value.strip()
+    return lines[0], headers
+
+
+def parse_ssdp_announcement(data: bytes) -> Optional[Tuple[str, bool, Dict[str, str]]]:
+    """
+    Parse the given SSDP announcement or search response.
+
+    Returns the unique device name, true if the device is alive and the headers, or None if not an announcement.
+    """
+    start_line, headers = parse_ssdp_headers(data)
+    if start_line.startswith("NOTIFY"):
+        nts = headers.get("NTS", "")
+        if nts not in ("ssdp:alive", "ssdp:byebye"):
+            return None
+        alive = nts == "ssdp:alive"
+    elif start_line.startswith("HTTP/"):
+        alive = True
+    else:
+        # Search requests of other control points
+        return None
+    # The notification types of a device are announced with the same unique device name
+    udn = headers.get("USN", "").split("::")[0]
+    if not udn:
+        return None
+    return udn, alive, headers
+
+
+@dataclass
+class SsdpCacheEntry:
+    """UPnP device announced on the network with its identified Orange TV device, if any."""
+
+    location: str
+    expires: float
+    device: Optional[Dict] = None
+
+
+class SsdpListener(asyncio.DatagramProtocol):
+    """Passive SSDP listener caching the Orange TV devices announced on the network.
+
+    The ``NOTIFY ssdp:alive`` announcements and the search responses are cached per device (unique device name of the
+    USN) until their max-age expiry, the SCPD XML resource of a new location being fetched and evaluated once.
+    ``NOTIFY ssdp:byebye`` announcements remove the device.
+    """
+
+    def __init__(self):
+        """Create the listener, started with start()."""
+        self._entries: Dict[str, SsdpCacheEntry] = {}
+        self._fetches = SingleFlight()
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: Set[asyncio.Task] = set()
+        # Emits SSDP_ADDRESS_CHANGED with the previous and new host of a device when its location changes
+        self.events = AsyncIOEventEmitter()
+
+    @property
+    def started(self) -> bool:
+        """Return true if the listener is started."""
+        return self._transport is not None
+
+    async def start(self) -> bool:
+        """Join the SSDP multicast group and search for the devices, return false if the listener cannot start."""
+        if self.started:
+            return True
+        loop = asyncio.get_running_loop()
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, "SO_REUSEPORT"):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind(("", SSDP_PORT))
+            membership = struct.pack("4s4s", socket.inet_aton(SSDP_ADDR), socket.inet_aton("0.0.0.0"))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            await loop.create_datagram_endpoint(lambda: self, sock=sock)
+        except OSError as err:
+            _LOGGER.warning("Cannot listen to SSDP announcements: %s", err)
+            return False
+        self._client = httpx.AsyncClient(
+            timeout=SCPD_TIMEOUT, limits=httpx.Limits(max_connections=SCPD_MAX_CONCURRENCY)
+        )
+        for ssdp_st in SSDP_ST_LIST:
+            self._transport.sendto(ssdp_request(ssdp_st), SSDP_TARGET)
+        _LOGGER.debug("Listening to SSDP announcements")
+        return True
+
+    async def stop(self) -> None:
+        """Leave the SSDP multicast group and release the cached devices."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._entries.clear()
+
+    def devices(self) -> List[Dict]:
+        """Return the identified Orange TV devices which are still alive."""
+        now = time.monotonic()
+        for udn in [udn for udn, entry in self._entries.items() if entry.expires <= now]:
+            del self._entries[udn]
+        return [entry.device for entry in self._entries.values() if entry.device is not None]
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        """Keep the transport to send the search requests."""
+        self._transport = transport
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Forget the closed transport."""
+        self._transport = None
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Track the announcements and search responses of the UPnP devices."""
+        announcement = parse_ssdp_announcement(data)
+        if announcement is None:
+            return
+        udn, alive, headers = announcement
+        if not alive:
+            if self._entries.pop(udn, None) is not None:
+                _LOGGER.debug("SSDP device %s left", udn)
+            return
+        location = headers.get("LOCATION", None)
+        if not location:
+            return
+        match = SSDP_MAX_AGE_PATTERN.search(headers.get("CACHE-CONTROL", ""))
+        expires = time.monotonic() + (int(match.group(1)) if match else SSDP_DEFAULT_MAX_AGE)
+        entry = self._entries.get(udn, None)
+        if entry is not None and entry.location == location:
+            entry.expires = expires
+            return
+        if location in self._fetches or self._client is None:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._fetches.do(location, lambda: self._identify(udn, location, expires))
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _identify(self, udn: str, location: str, expires: float) -> None:
+        """Fetch and evaluate the SCPD XML resource of a new or moved device."""
+        device = await async_fetch_device(self._client, location)
+        previous = self._entries.get(udn, None)
+        self._entries[udn] = SsdpCacheEntry(location=location, expires=expires, device=device)
+        if device is None:
+            return
+        _LOGGER.debug("SSDP device %s identified at %s: %s", udn, location, device)
+        if previous is not None and previous.device is not None:
+            old_host, new_host = previous.device.get("host"), device.get("host")
+            if old_host and new_host and old_host != new_host:
+                _LOGGER.info("SSDP device %s moved from %s to %s", udn, old_host, new_host)
+                self.events.emit(SSDP_ADDRESS_CHANGED, old_host, new_host)
+
+
+ssdp_listener = SsdpListener()
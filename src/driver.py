@@ -7,6 +7,7 @@ This module implements a Remote Two integration driver for Orange STB.
 """
 
 import asyncio
+import functools
 import logging
 import os
 import sys
@@ -16,12 +17,18 @@ from typing import Any, Type
 # sys.path.insert(0, os.path.abspath("../integration-python-library"))  # pylint: disable=C0413
 import ucapi
 
+import artwork
 import client
 import config
+import discover
+import epg
 import media_player
+import providers
 import remote
+import scheduler
 import selector
 import sensor
+import sessions
 import setup_flow
 from client import OrangeTVClient
 from config import OrangeEntity
@@ -38,7 +45,11 @@ asyncio.set_event_loop(_LOOP)
 api = ucapi.IntegrationAPI(_LOOP)
 # Map of device_id -> Orange instance
 _configured_devices: dict[str, OrangeTVClient] = {}
+# Single poll scheduler of all the configured devices
+_poll_scheduler = scheduler.PollScheduler()
 _remote_in_standby = False
+# Delay in seconds between two logs of the polling and connection pool metrics
+METRICS_LOG_INTERVAL = 600
 
 
 @api.listens_to(ucapi.Events.CONNECT)
@@ -75,12 +86,29 @@ async def on_enter_standby() -> None:
         await device.disconnect()
 
 
+@functools.cache
+def _attribute_keys(attribute_type: Type[Enum]) -> frozenset[str]:
+    """Return the attribute keys of an Enum class."""
+    return frozenset(e.value for e in attribute_type)
+
+
 def filter_attributes(attributes, attribute_type: Type[Enum]) -> dict[str, Any]:
     """Filter attributes based on an Enum class."""
-    valid_keys = {e.value for e in attribute_type}
+    valid_keys = _attribute_keys(attribute_type)
     return {k: v for k, v in attributes.items() if k in valid_keys}
 
 
+def changed_attributes(entity: OrangeEntity, attributes: dict[str, Any] | None) -> dict[str, Any]:
+    """Return the given attributes which differ from the last ones sent for the entity.
+
+    The attributes of the entity are updated by the integration library with the sent ones.
+    """
+    if not attributes:
+        return {}
+    sent = entity.attributes
+    return {k: v for k, v in attributes.items() if k not in sent or sent[k] != v}
+
+
 @api.listens_to(ucapi.Events.EXIT_STANDBY)
 async def on_exit_standby() -> None:
     """
@@ -115,18 +143,11 @@ async def on_subscribe_entities(entity_ids: list[str]) -> None:
         device_id = entity.deviceid
         if device_id in _configured_devices:
             device = _configured_devices[device_id]
-            state = device.state
             if isinstance(entity, media_player.OrangeMediaPlayer):
                 api.configured_entities.update_attributes(
                     entity_id, filter_attributes(device.attributes, ucapi.media_player.Attributes)
                 )
-            elif isinstance(entity, remote.OrangeRemote):
-                api.configured_entities.update_attributes(
-                    entity_id, {ucapi.remote.Attributes.STATE: remote.REMOTE_STATE_MAPPING.get(state)}
-                )
-            elif isinstance(entity, sensor.OrangeSensor):
-                api.configured_entities.update_attributes(entity_id, entity.update_attributes())
-            elif isinstance(entity, selector.OrangeSelect):
+            elif isinstance(entity, (remote.OrangeRemote, sensor.OrangeSensor, selector.OrangeSelect)):
                 api.configured_entities.update_attributes(entity_id, entity.update_attributes())
             continue
 
@@ -247,6 +268,13 @@ async def handle_device_address_change(device_id: str, address: str) -> None:
         config.devices.update(device)
 
 
+async def on_ssdp_address_change(old_address: str, address: str) -> None:
+    """Update the configured devices announced on the network with a new IP address."""
+    for device in config.devices.all():
+        if device.address == old_address:
+            await handle_device_address_change(device.id, address)
+
+
 async def on_device_update(device_id: str, update: dict[str, Any] | None) -> None:
     """
     Update attributes of configured media-player entity if device properties changed.
@@ -262,19 +290,16 @@ async def on_device_update(device_id: str, update: dict[str, Any] | None) -> Non
     else:
         _LOG.info("[%s] OrangeTV update: %s", device_id, update)
 
-    attributes = None
-
     # TODO awkward logic: this needs better support from the integration library
     for configured_entity in _get_entities(device_id):
+        attributes = None
         if isinstance(configured_entity, media_player.OrangeMediaPlayer):
             attributes = filter_attributes(update, ucapi.media_player.Attributes)
-        elif isinstance(configured_entity, remote.OrangeRemote):
-            attributes = configured_entity.filter_changed_attributes(update)
-        elif isinstance(configured_entity, sensor.OrangeSensor):
-            attributes = configured_entity.update_attributes(update)
-        elif isinstance(configured_entity, selector.OrangeSelect):
+        elif isinstance(configured_entity, (remote.OrangeRemote, sensor.OrangeSensor, selector.OrangeSelect)):
             attributes = configured_entity.update_attributes(update)
 
+        # Only forward the attributes which have changed since the last update of the entity
+        attributes = changed_attributes(configured_entity, attributes)
         if attributes:
             api.configured_entities.update_attributes(configured_entity.id, attributes)
 
@@ -318,7 +343,7 @@ def _configure_new_device(device_config: config.OrangeConfigDevice, connect: boo
     else:
         if device_config.country is None:
             device_config.country = "france"
-        device = OrangeTVClient(device_config)
+        device = OrangeTVClient(device_config, poll_scheduler=_poll_scheduler)
 
         device.events.on(client.Events.CONNECTED, on_device_connected)
         device.events.on(client.Events.ERROR, on_device_connection_error)
@@ -366,6 +391,7 @@ def on_device_updated(device: config.OrangeConfigDevice) -> None:
         _LOG.debug("Disconnecting from removed device %s", device.id)
         configured = _configured_devices.pop(device.id)
         configured.events.remove_all_listeners()
+        _LOOP.create_task(configured.disconnect())
         for entity in _get_entities(configured.id):
             api.configured_entities.remove(entity.id)
             api.available_entities.remove(entity.id)
@@ -393,25 +419,44 @@ def on_device_removed(device: config.OrangeConfigDevice | None) -> None:
 
 async def _async_remove(device: OrangeTVClient) -> None:
     """Disconnect from receiver and remove all listeners."""
-    # await device.disconnect()
+    await device.disconnect()
     device.events.remove_all_listeners()
 
 
+async def _log_metrics() -> None:
+    """Log the polling lags and the connection pool metrics periodically."""
+    while True:
+        await asyncio.sleep(METRICS_LOG_INTERVAL)
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug(
+                "Poll lags (s): %s", {device_id: round(lag, 2) for device_id, lag in _poll_scheduler.lags.items()}
+            )
+            _LOG.debug("HTTP session metrics: %s", sessions.session_manager.metrics)
+
+
 async def main():
     """Start the Remote Two integration driver."""
     logging.basicConfig()
 
     level = os.getenv("UC_LOG_LEVEL", "DEBUG").upper()
+    logging.getLogger("artwork").setLevel(level)
     logging.getLogger("client").setLevel(level)
     logging.getLogger("discover").setLevel(level)
     logging.getLogger("driver").setLevel(level)
+    logging.getLogger("epg").setLevel(level)
     logging.getLogger("media_player").setLevel(level)
     logging.getLogger("setup_flow").setLevel(level)
     logging.getLogger("remote").setLevel(level)
+    logging.getLogger("scheduler").setLevel(level)
     logging.getLogger("sensor").setLevel(level)
     logging.getLogger("selector").setLevel(level)
+    logging.getLogger("sessions").setLevel(level)
 
     config.devices = config.Devices(api.config_dir_path, on_device_added, on_device_removed, on_device_updated)
+    epg.epg_cache.load_snapshot(api.config_dir_path, providers.EPG_PROVIDERS.values())
+    artwork.artwork_cache.set_path(api.config_dir_path)
+    discover.ssdp_listener.events.on(discover.SSDP_ADDRESS_CHANGED, on_ssdp_address_change)
+    await discover.ssdp_listener.start()
     for device in config.devices.all():
         _LOG.debug("UC Orange device %s %s", device.id, device.address)
         _configure_new_device(device, connect=False)
@@ -421,6 +466,7 @@ async def main():
             continue
         _LOOP.create_task(device.update())
 
+    _LOOP.create_task(_log_metrics())
     await api.init("driver.json", setup_flow.driver_setup_handler)
 
 
@@ -0,0 +1,775 @@
+"""
+EPG cache shared by all the Orange TV clients of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import asyncio
+import copy
+import gzip
+import heapq
+import itertools
+import json
+import logging
+import math
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Iterator, Sequence
+
+from coalesce import SingleFlight
+
+_LOGGER = logging.getLogger(__name__)
+
+EPG_REFRESH = 10 * 60
+EPG_MIN_TTL = 30
+EPG_WINDOW_CURRENT = "current"
+EPG_SNAPSHOT_FILENAME = "epg_snapshot.json.gz"
+EPG_SNAPSHOT_VERSION = 3
+EPG_SNAPSHOT_MAX_AGE = 3 * 60 * 60
+EPG_REFRESH_AHEAD = 60
+EPG_REFRESH_BATCH = 50
+EPG_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+EpgData = dict[str, Any]
+EpgKey = tuple[str, str | None, str]
+EpgFetcher = Callable[[], Awaitable[EpgData | None]]
+EpgChannelsFetcher = Callable[[list[str]], Awaitable[EpgData | None]]
+
+
+_strings: dict[str, str] = {}
+
+
+def intern_string(value: Any) -> str | None:
+    """Return the shared instance of the given string (genres, channel ids...) from the interning table."""
+    if value is None:
+        return None
+    value = str(value)
+    return _strings.setdefault(value, value)
+
+
+class Program:
+    """Compact EPG program record, holding only the fields used by the driver."""
+
+    # pylint: disable=R0902,R0913,R0917
+
+    __slots__ = (
+        "channel_id",
+        "start",
+        "duration",
+        "title",
+        "series_title",
+        "season",
+        "episode",
+        "genre",
+        "definition",
+        "image",
+    )
+
+    def __init__(
+        self,
+        channel_id: str | None,
+        start: int,
+        duration: int,
+        title: str | None,
+        series_title: str | None = None,
+        season: int | None = None,
+        episode: int | None = None,
+        genre: str | None = None,
+        definition: str | None = None,
+        image: str | None = None,
+    ):
+        """Create the program, repeated strings are interned."""
+        self.channel_id = intern_string(channel_id)
+        self.start = start
+        self.duration = duration
+        self.title = title
+        self.series_title = series_title
+        self.season = season
+        self.episode = episode
+        self.genre = intern_string(genre)
+        self.definition = intern_string(definition)
+        self.image = image
+
+    @property
+    def end(self) -> int:
+        """Return the end timestamp of the program."""
+        return self.start + self.duration
+
+    @property
+    def is_episode(self) -> bool:
+        """Return true if the program is an episode of a series."""
+        return self.series_title is not None
+
+    def to_list(self) -> list[Any]:
+        """Return the fields of the program, in slots order (snapshot serialization)."""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: list[Any]) -> "Program":
+        """Build the program from the values returned by ``to_list``."""
+        return cls(*values)
+
+
+def dump_channel_groups(data: EpgData) -> EpgData:
+    """Return the JSON-serializable form of a payload of programs grouped by channel."""
+    return {channel_id: [program.to_list() for program in programs] for channel_id, programs in data.items()}
+
+
+def load_channel_groups(data: EpgData) -> EpgData:
+    """Build a payload of programs grouped by channel from the form returned by ``dump_channel_groups``."""
+    return {channel_id: [Program.from_list(values) for values in programs] for channel_id, programs in data.items()}
+
+
+class EpgTimeline:
+    """Programs of a channel sorted by start time, with epoch integer bounds for bisect lookups."""
+
+    __slots__ = ("starts", "ends", "entries")
+
+    def __init__(self, entries: list[Program]):
+        """Build the timeline of the given programs."""
+        self.entries: list[Program] = sorted(entries, key=lambda program: program.start)
+        self.starts: list[int] = [program.start for program in self.entries]
+        self.ends: list[int] = [program.end for program in self.entries]
+
+    def __len__(self) -> int:
+        """Return the number of programs."""
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Program]:
+        """Iterate over the programs sorted by start time."""
+        return iter(self.entries)
+
+    def index_at(self, timestamp: float) -> int:
+        """Return the index of the program on air at the given timestamp or -1."""
+        index = bisect_right(self.starts, timestamp) - 1
+        if index >= 0 and timestamp < self.ends[index]:
+            return index
+        return -1
+
+    def at(self, timestamp: float) -> Program | None:
+        """Return the program on air at the given timestamp."""
+        index = self.index_at(timestamp)
+        return self.entries[index] if index >= 0 else None
+
+    def current(self, now: float | None = None) -> Program | None:
+        """Return the program currently on air."""
+        return self.at(time.time() if now is None else now)
+
+    def next(self, now: float | None = None) -> Program | None:
+        """Return the first program starting after the given timestamp (now by default)."""
+        index = bisect_right(self.starts, time.time() if now is None else now)
+        return self.entries[index] if index < len(self.entries) else None
+
+    def end_at(self, timestamp: float) -> int | None:
+        """Return the end timestamp of the program on air at the given timestamp."""
+        index = self.index_at(timestamp)
+        return self.ends[index] if index >= 0 else None
+
+    def first(self) -> Program | None:
+        """Return the first program of the timeline."""
+        return self.entries[0] if self.entries else None
+
+
+class TimelineView(Sequence):
+    """Read-only sequence of the timelines of the given channels, sliced without copying the whole guide."""
+
+    def __init__(self, channel_ids: Sequence[str], timelines: dict[str, EpgTimeline]):
+        """Create the view of the given channels."""
+        self._channel_ids = channel_ids
+        self._timelines = timelines
+
+    def __len__(self) -> int:
+        """Return the number of channels."""
+        return len(self._channel_ids)
+
+    def __getitem__(self, index):
+        """Return the timeline at the given index, or the list of timelines of the given slice."""
+        if isinstance(index, slice):
+            return [self._timelines[channel_id] for channel_id in self._channel_ids[index]]
+        return self._timelines[self._channel_ids[index]]
+
+
+class GenreIndex:
+    """Channels indexed by the genre of their current program, in guide order.
+
+    The genre of a channel only changes at its program boundaries : they are kept in a heap so that lookups only
+    re-index the channels whose program has changed since the previous lookup. Like the browse entries, a channel
+    without any program on air is indexed by its first program.
+    """
+
+    def __init__(self, timelines: dict[str, EpgTimeline]):
+        """Build the index of the given channel timelines."""
+        self._timelines = timelines
+        self._order: dict[str, int] = {channel_id: i for i, channel_id in enumerate(timelines)}
+        self._genre_of: dict[str, str] = {}
+        self._until: dict[str, float] = {}
+        self._channels: dict[str, list[str]] = {}
+        self._boundaries: list[tuple[float, str]] = []
+        self._counts: Counter[str] = Counter()
+        self._genres: list[str] | None = None
+        now = time.time()
+        for channel_id, timeline in timelines.items():
+            self._counts.update(program.genre or "" for program in timeline)
+            self._index_channel(channel_id, now)
+
+    def updated(self, timelines: dict[str, EpgTimeline], channel_ids: Iterable[str]) -> "GenreIndex":
+        """Return a copy of this index for the given timelines, where only the given channels have changed."""
+        index = copy.copy(self)
+        index.update(timelines, channel_ids)
+        return index
+
+    def update(self, timelines: dict[str, EpgTimeline], channel_ids: Iterable[str]) -> None:
+        """Switch to the given timelines and re-index the given channels only.
+
+        The containers of the index are copied first, so that the copies of this index are left untouched.
+        """
+        previous_timelines = self._timelines
+        self._timelines = timelines
+        self._order = dict(self._order)
+        self._genre_of = dict(self._genre_of)
+        self._until = dict(self._until)
+        self._channels = {genre: list(channels) for genre, channels in self._channels.items()}
+        self._boundaries = list(self._boundaries)
+        self._counts = Counter(self._counts)
+        self._genres = None
+        now = time.time()
+        for channel_id in channel_ids:
+            previous = previous_timelines.get(channel_id, None)
+            if previous is not None:
+                self._counts.subtract(program.genre or "" for program in previous)
+            self._counts.update(program.genre or "" for program in timelines[channel_id])
+            self._order.setdefault(channel_id, len(self._order))
+            self._index_channel(channel_id, now)
+
+    def genres(self) -> list[str]:
+        """Return the sorted genres of all the programs."""
+        if self._genres is None:
+            self._genres = sorted(genre for genre, count in self._counts.items() if count > 0)
+        return self._genres
+
+    def channels(self, genre: str, now: float | None = None) -> list[str]:
+        """Return the channels whose current program has the given genre, in guide order (read-only)."""
+        now = time.time() if now is None else now
+        while self._boundaries and self._boundaries[0][0] <= now:
+            until, channel_id = heapq.heappop(self._boundaries)
+            if self._until.get(channel_id, None) == until:
+                self._index_channel(channel_id, now)
+        return self._channels.get(genre, [])
+
+    def _index_channel(self, channel_id: str, now: float) -> None:
+        """Index the given channel by the genre of its current program."""
+        timeline = self._timelines[channel_id]
+        index = timeline.index_at(now)
+        if index >= 0:
+            program, until = timeline.entries[index], timeline.ends[index]
+        else:
+            following = bisect_right(timeline.starts, now)
+            program = timeline.first()
+            until = timeline.starts[following] if following < len(timeline) else math.inf
+        genre = (program.genre or "") if program else None
+        previous = self._genre_of.pop(channel_id, None)
+        if previous is not None:
+            channels = self._channels[previous]
+            del channels[bisect_left(channels, self._order[channel_id], key=self._order.__getitem__)]
+            if not channels:
+                del self._channels[previous]
+        if genre is not None:
+            self._genre_of[channel_id] = genre
+            insort(self._channels.setdefault(genre, []), channel_id, key=self._order.__getitem__)
+        self._until[channel_id] = until
+        if until != math.inf:
+            heapq.heappush(self._boundaries, (until, channel_id))
+
+
+_guide_versions = itertools.count(1)
+
+
+class EpgGuide:
+    """EPG guide indexed by channel identifier.
+
+    Every guide gets a new ``version`` : cached views of a guide are keyed by it. Channels can also be looked up by
+    alias, when the identifiers of the EPG differ from the ones of the STB.
+    """
+
+    def __init__(
+        self,
+        timelines: dict[str, EpgTimeline],
+        genre_index: GenreIndex | None = None,
+        aliases: dict[str, str] | None = None,
+    ):
+        """Create the guide from the given channel timelines, the genre index is built on first use if not given."""
+        self._timelines = timelines
+        self._channel_ids: tuple[str, ...] = tuple(timelines)
+        self._genre_index = genre_index
+        self._aliases = aliases if aliases is not None else {}
+        self.version = next(_guide_versions)
+
+    @classmethod
+    def from_channel_groups(cls, data: EpgData) -> "EpgGuide":
+        """Build the guide from programs grouped by channel."""
+        return cls(
+            {channel_id: EpgTimeline(entries) for channel_id, entries in data.items() if isinstance(entries, list)}
+        )
+
+    def get(self, channel_id: str) -> EpgTimeline | None:
+        """Return the timeline of the given channel identifier or alias."""
+        timeline = self._timelines.get(channel_id, None)
+        if timeline is None and channel_id in self._aliases:
+            timeline = self._timelines.get(self._aliases[channel_id], None)
+        return timeline
+
+    @property
+    def aliases(self) -> dict[str, str]:
+        """Return the channel identifiers by alias (read-only)."""
+        return self._aliases
+
+    def __contains__(self, channel_id: str) -> bool:
+        """Return true if the guide contains the given channel identifier or alias."""
+        return self.get(channel_id) is not None
+
+    def __len__(self) -> int:
+        """Return the number of channels."""
+        return len(self._timelines)
+
+    def items(self):
+        """Return the (channel identifier, timeline) pairs."""
+        return self._timelines.items()
+
+    def values(self):
+        """Return the channel timelines."""
+        return self._timelines.values()
+
+    def channels(self) -> TimelineView:
+        """Return the timelines of all the channels in guide order, as a sequence which can be sliced."""
+        return TimelineView(self._channel_ids, self._timelines)
+
+    @property
+    def genre_index(self) -> GenreIndex:
+        """Return the index of the channels by genre of their current program."""
+        if self._genre_index is None:
+            self._genre_index = GenreIndex(self._timelines)
+        return self._genre_index
+
+    def channels_of_genre(self, genre: str) -> TimelineView:
+        """Return the timelines of the channels whose current program has the given genre, in guide order."""
+        return TimelineView(self.genre_index.channels(genre), self._timelines)
+
+    def merge(self, other: "EpgGuide") -> "EpgGuide":
+        """Return a new guide with the timelines of the given guide replacing the ones of this guide.
+
+        The genre index, if already built, is updated for the replaced channels only.
+        """
+        changed = dict(other.items())
+        timelines = {**self._timelines, **changed}
+        genre_index = self._genre_index.updated(timelines, changed) if self._genre_index is not None else None
+        return EpgGuide(timelines, genre_index, {**self._aliases, **other.aliases})
+
+    def ending_channels(self, timestamp: float) -> list[str]:
+        """Return the channels without any program on air at the given timestamp."""
+        return [channel_id for channel_id, timeline in self._timelines.items() if timeline.index_at(timestamp) < 0]
+
+
+class EpgProvider:
+    """EPG backend of a country : how its guide is requested, normalized into programs and indexed.
+
+    Payloads are normalized into programs grouped by channel identifier, the default index and snapshot serialization
+    of the guides apply to this shape.
+    """
+
+    country: str = ""
+    url: str = ""
+    user_agent: str = ""
+    timezone: str = ""
+    channels: list[dict[str, str]] = []
+    # True if the guide can be requested for a subset of channels : channel requests and incremental refresh
+    channel_requests: bool = False
+
+    def request_params(self, channel_id: str | None = None) -> dict[str, str]:
+        """Return the query parameters of the EPG request of the given channels (comma-separated), all if not set."""
+        raise NotImplementedError()
+
+    async def parse(self, chunks: AsyncIterable[bytes]) -> EpgData:
+        """Parse the EPG payload as it is received into programs grouped by channel."""
+        raise NotImplementedError()
+
+    def build_guide(self, data: EpgData) -> EpgGuide:
+        """Index the given programs grouped by channel."""
+        return EpgGuide.from_channel_groups(data)
+
+    def image_url(self, program: Program) -> str | None:
+        """Return the image url of the given program."""
+        return program.image
+
+    def dump(self, data: EpgData) -> EpgData:
+        """Return the JSON-serializable form of the given payload (snapshot)."""
+        return dump_channel_groups(data)
+
+    def load(self, data: EpgData) -> EpgData:
+        """Build the payload from the form returned by ``dump``."""
+        return load_channel_groups(data)
+
+
+@dataclass
+class EpgCacheEntry:
+    """Cached EPG payload with its index and expiry timestamp."""
+
+    data: EpgData
+    timestamp: float
+    expires: float
+    guide: EpgGuide | None = field(default=None)
+    accessed: float = 0
+
+
+class EpgCache:
+    """Process-wide EPG cache keyed by (country, channel, time window).
+
+    Entries requested for a single channel expire at the end of the program currently on air (bounded by
+    ``max_ttl``), entries for the whole guide expire after ``max_ttl``. Only one fetch per key can run at a time :
+    concurrent callers wait for the same request.
+
+    Whole guides are refreshed in the background, ahead of their expiry and as long as they are used. Guides requested
+    with a channels fetcher are refreshed incrementally : only the channels running out of programs are fetched again
+    and merged into the cached guide.
+
+    The whole guides are saved to a compressed snapshot file so that they can be served (stale) right after a
+    restart while they are refreshed in the background.
+
+    Payloads are indexed and serialized by the EPG provider of their country, given on request or when loading the
+    snapshot.
+    """
+
+    def __init__(self, max_ttl: float = EPG_REFRESH, min_ttl: float = EPG_MIN_TTL):
+        """Create the EPG cache."""
+        self._max_ttl = max_ttl
+        self._min_ttl = min_ttl
+        self._entries: dict[EpgKey, EpgCacheEntry] = {}
+        self._requests = SingleFlight()
+        self._refreshers: dict[EpgKey, tuple[EpgFetcher, EpgChannelsFetcher]] = {}
+        self._refresh_handles: dict[EpgKey, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._snapshot_path: str | None = None
+        self._snapshot_task: asyncio.Task | None = None
+        self._snapshot_pending = False
+        self._providers: dict[str, EpgProvider] = {}
+
+    @staticmethod
+    def key(country: str, channel_id: str | None = None, window: str = EPG_WINDOW_CURRENT) -> EpgKey:
+        """Build the cache key of the given request."""
+        return country, channel_id, window
+
+    @staticmethod
+    def _current_program_end(entry: EpgCacheEntry, channel_id: str, now: float) -> int | None:
+        """Return the end timestamp of the program currently on air for the given channel, if any."""
+        if entry.guide is None:
+            return None
+        timeline = entry.guide.get(channel_id)
+        return timeline.end_at(now) if timeline else None
+
+    def add_provider(self, provider: EpgProvider) -> None:
+        """Register the EPG provider indexing and serializing the payloads of its country."""
+        self._providers[provider.country] = provider
+
+    def _new_entry(self, key: EpgKey, data: EpgData, timestamp: float, expires: float) -> EpgCacheEntry:
+        """Build a cache entry, indexing its payload once."""
+        provider = self._providers.get(key[0], None)
+        return EpgCacheEntry(
+            data=data, timestamp=timestamp, expires=expires, guide=provider.build_guide(data) if provider else None
+        )
+
+    def _expiry(self, key: EpgKey, entry: EpgCacheEntry, now: float) -> float:
+        """Compute the expiry timestamp of the given entry, aligned on program boundaries if possible."""
+        expires = now + self._max_ttl
+        channel_id = key[1]
+        if channel_id is not None:
+            end = self._current_program_end(entry, channel_id, now)
+            if end is not None:
+                expires = min(expires, max(end, now + self._min_ttl))
+        return expires
+
+    def _lookup(self, country: str, channel_id: str | None, window: str) -> EpgCacheEntry | None:
+        """Return the valid cache entry which can answer the given request."""
+        now = time.time()
+        entry = self._entries.get(self.key(country, channel_id, window), None)
+        if entry and entry.expires > now:
+            return entry
+        if channel_id is None:
+            return None
+        # A channel request can be answered from the whole guide if it contains the current program
+        entry = self._entries.get(self.key(country, None, window), None)
+        if entry and entry.expires > now and self._current_program_end(entry, channel_id, now) is not None:
+            return entry
+        return None
+
+    def covers(self, country: str, channel_id: str, window: str = EPG_WINDOW_CURRENT) -> bool:
+        """Return True if the cached whole guide, even expired, contains the current program of the given channel."""
+        entry = self._entries.get(self.key(country, None, window), None)
+        return entry is not None and self._current_program_end(entry, channel_id, time.time()) is not None
+
+    async def get_guide(
+        self,
+        provider: EpgProvider,
+        channel_id: str | None,
+        fetcher: EpgFetcher,
+        window: str = EPG_WINDOW_CURRENT,
+        allow_stale: bool = False,
+        *,
+        channels_fetcher: EpgChannelsFetcher | None = None,
+    ) -> EpgGuide | None:
+        """Return the indexed EPG guide of the given key, fetching it once if missing or expired.
+
+        If ``allow_stale`` is set and an expired guide is available, it is returned immediately and refreshed in the
+        background. The ``channels_fetcher`` of a whole guide request fetches the given channels only, it enables the
+        incremental refresh of the guide. The guide of a channel request may be the whole guide if it already contains
+        the current program.
+        """
+        entry = await self._get_entry(
+            provider, channel_id, fetcher, window, allow_stale, channels_fetcher=channels_fetcher
+        )
+        return entry.guide if entry else None
+
+    async def fetch_guide(
+        self, provider: EpgProvider, channel_id: str | None, fetcher: EpgFetcher, window: str = EPG_WINDOW_CURRENT
+    ) -> EpgGuide | None:
+        """Fetch the indexed EPG guide of the given key even if cached, without falling back to the whole guide."""
+        self.add_provider(provider)
+        entry = await self._fetch(self.key(provider.country, channel_id, window), fetcher)
+        return entry.guide if entry else None
+
+    async def _get_entry(
+        self,
+        provider: EpgProvider,
+        channel_id: str | None,
+        fetcher: EpgFetcher,
+        window: str,
+        allow_stale: bool,
+        *,
+        channels_fetcher: EpgChannelsFetcher | None = None,
+    ) -> EpgCacheEntry | None:
+        country = provider.country
+        self.add_provider(provider)
+        key = self.key(country, channel_id, window)
+        if channel_id is None:
+            self._refreshers[key] = (fetcher, channels_fetcher)
+        entry = self._lookup(country, channel_id, window)
+        if entry is None:
+            entry = self._entries.get(key, None)
+            if not allow_stale or entry is None:
+                entry = await self._fetch(key, fetcher)
+            elif key not in self._requests:
+                _LOGGER.debug("EPG cache serving stale data for %s, refreshing in background", key)
+                self._start_background_refresh(key, fetcher, channels_fetcher)
+        if entry is not None:
+            entry.accessed = time.time()
+        return entry
+
+    async def _fetch(self, key: EpgKey, fetcher: EpgFetcher) -> EpgCacheEntry | None:
+        """Fetch the payload of the given key, sharing the request with concurrent callers."""
+
+        async def request() -> EpgCacheEntry | None:
+            data = await fetcher()
+            return self.set(key, data) if data else None
+
+        return await self._requests.do(key, request)
+
+    async def _refresh(
+        self, key: EpgKey, fetcher: EpgFetcher, channels_fetcher: EpgChannelsFetcher | None
+    ) -> EpgCacheEntry | None:
+        """Refresh the whole guide of the given key, fetching only the channels running out of programs if possible.
+
+        The whole guide is fetched again if it cannot be refreshed incrementally or if most channels must be fetched.
+        """
+        entry = self._entries.get(key, None)
+        if entry is None or entry.guide is None or channels_fetcher is None:
+            return await self._fetch(key, fetcher)
+        channel_ids = entry.guide.ending_channels(time.time() + EPG_REFRESH_AHEAD)
+        if len(channel_ids) * 2 > len(entry.guide):
+            return await self._fetch(key, fetcher)
+
+        async def request() -> EpgCacheEntry | None:
+            return await self._merge_channels(key, entry, channel_ids, channels_fetcher)
+
+        return await self._requests.do(key, request)
+
+    async def _merge_channels(
+        self, key: EpgKey, entry: EpgCacheEntry, channel_ids: list[str], channels_fetcher: EpgChannelsFetcher
+    ) -> EpgCacheEntry:
+        """Fetch the given channels by batches and merge them into the cached whole guide."""
+        batches = [channel_ids[start:][:EPG_REFRESH_BATCH] for start in range(0, len(channel_ids), EPG_REFRESH_BATCH)]
+        results = await asyncio.gather(*(channels_fetcher(batch) for batch in batches), return_exceptions=True)
+        partial: EpgData = {}
+        for result in results:
+            if isinstance(result, dict):
+                partial.update(result)
+            elif result is not None:
+                _LOGGER.warning("EPG refresh of %s failed for a batch of channels: %s", key, result)
+        if channel_ids and not partial:
+            # Nothing could be fetched : keep the cached guide and its expiry
+            return entry
+        now = time.time()
+        merged = EpgCacheEntry(
+            data={**entry.data, **partial},
+            timestamp=now,
+            expires=0,
+            guide=entry.guide.merge(self._providers[key[0]].build_guide(partial)),
+            accessed=entry.accessed,
+        )
+        merged.expires = self._expiry(key, merged, now)
+        _LOGGER.debug("EPG cache refreshed %s/%s channels for %s", len(channel_ids), len(entry.guide), key)
+        return self._store(key, merged, now)
+
+    async def _background_refresh(
+        self, key: EpgKey, fetcher: EpgFetcher, channels_fetcher: EpgChannelsFetcher | None
+    ) -> None:
+        """Refresh the given key in the background."""
+        try:
+            await self._refresh(key, fetcher, channels_fetcher)
+        # pylint: disable=W0718
+        except Exception as ex:
+            _LOGGER.warning("EPG background refresh of %s failed: %s", key, ex)
+
+    def _schedule_refresh(self, key: EpgKey, entry: EpgCacheEntry, now: float) -> None:
+        """Schedule the refresh of the given whole guide ahead of its expiry."""
+        handle = self._refresh_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        if key not in self._refreshers:
+            return
+        delay = max(entry.expires - now - EPG_REFRESH_AHEAD, self._min_ttl)
+        self._refresh_handles[key] = asyncio.get_running_loop().call_later(delay, self._refresh_ahead, key)
+
+    def _refresh_ahead(self, key: EpgKey) -> None:
+        """Start the refresh of the given whole guide if it has been used since its last refresh."""
+        self._refresh_handles.pop(key, None)
+        entry = self._entries.get(key, None)
+        if entry is None or key in self._requests:
+            return
+        if entry.accessed < entry.timestamp:
+            # Unused guide : it will be refreshed on next use
+            _LOGGER.debug("EPG cache skipping refresh of unused guide %s", key)
+            return
+        fetcher, channels_fetcher = self._refreshers[key]
+        self._start_background_refresh(key, fetcher, channels_fetcher)
+
+    def _start_background_refresh(
+        self, key: EpgKey, fetcher: EpgFetcher, channels_fetcher: EpgChannelsFetcher | None
+    ) -> None:
+        task = asyncio.get_running_loop().create_task(self._background_refresh(key, fetcher, channels_fetcher))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def set(self, key: EpgKey, data: EpgData) -> EpgCacheEntry:
+        """Index and store the given payload in cache."""
+        now = time.time()
+        entry = self._new_entry(key, data, now, 0)
+        entry.expires = self._expiry(key, entry, now)
+        return self._store(key, entry, now)
+
+    def _store(self, key: EpgKey, entry: EpgCacheEntry, now: float) -> EpgCacheEntry:
+        """Store the given entry, save and schedule the refresh of whole guides."""
+        self._purge(now)
+        self._entries[key] = entry
+        _LOGGER.debug("EPG cache updated for %s, %s entries cached", key, len(self._entries))
+        if key[1] is None:
+            self._schedule_refresh(key, entry, now)
+            if self._snapshot_path:
+                self._save_snapshot()
+        return entry
+
+    def invalidate(self, country: str, channel_id: str | None = None, window: str = EPG_WINDOW_CURRENT) -> None:
+        """Mark the cached payload of the given key as expired, it can still be served stale.
+
+        Whole guides fetched less than ``min_ttl`` seconds ago are kept valid, to avoid fetching them again and again.
+        """
+        entry = self._entries.get(self.key(country, channel_id, window), None)
+        if entry is None or (channel_id is None and time.time() - entry.timestamp < self._min_ttl):
+            return
+        entry.expires = 0
+
+    def _purge(self, now: float) -> None:
+        """Remove expired entries, except whole guides which can still be served stale."""
+        for key in [key for key, entry in self._entries.items() if entry.expires <= now and key[1] is not None]:
+            del self._entries[key]
+
+    def _snapshot_entries(self) -> list[dict[str, Any]]:
+        """Return the whole guides to save in the snapshot file."""
+        return [
+            {
+                "country": key[0],
+                "window": key[2],
+                "timestamp": entry.timestamp,
+                "data": self._providers[key[0]].dump(entry.data),
+            }
+            for key, entry in self._entries.items()
+            if key[1] is None and key[0] in self._providers
+        ]
+
+    def _save_snapshot(self) -> None:
+        """Queue the write of the snapshot file : one write at a time, the queued ones are coalesced."""
+        self._snapshot_pending = True
+        if self._snapshot_task is None:
+            self._snapshot_task = asyncio.get_running_loop().create_task(self._snapshot_writer())
+
+    async def _snapshot_writer(self) -> None:
+        """Write the snapshot file with the current whole guides until no write is queued."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._snapshot_pending:
+                self._snapshot_pending = False
+                await loop.run_in_executor(None, self._write_snapshot, self._snapshot_entries())
+        finally:
+            self._snapshot_task = None
+
+    def _write_snapshot(self, entries: list[dict[str, Any]]) -> None:
+        """Write the given entries to the snapshot file."""
+        tmp_path = self._snapshot_path + ".tmp"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+                json.dump(
+                    {"version": EPG_SNAPSHOT_VERSION, "entries": entries},
+                    f,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_path, self._snapshot_path)
+        except (OSError, TypeError, ValueError) as ex:
+            _LOGGER.warning("Cannot write the EPG snapshot file %s: %s", self._snapshot_path, ex)
+
+    def load_snapshot(self, data_path: str, providers: Iterable[EpgProvider] = ()) -> bool:
+        """Load the EPG snapshot file from the given directory and save next guides to it.
+
+        Loaded guides are marked as expired : they are served stale and refreshed on first use. Guides of countries
+        without any of the given providers are ignored.
+
+        :return: True if the snapshot could be loaded.
+        """
+        self._snapshot_path = os.path.join(data_path, EPG_SNAPSHOT_FILENAME)
+        for provider in providers:
+            self.add_provider(provider)
+        try:
+            with gzip.open(self._snapshot_path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version", None) != EPG_SNAPSHOT_VERSION:
+                _LOGGER.debug("Ignoring EPG snapshot with version %s", snapshot.get("version", None))
+                return False
+            now = time.time()
+            for item in snapshot.get("entries", []):
+                provider = self._providers.get(item["country"], None)
+                if provider is None or item["timestamp"] < now - EPG_SNAPSHOT_MAX_AGE:
+                    continue
+                key = self.key(item["country"], None, item["window"])
+                self._entries[key] = self._new_entry(key, provider.load(item["data"]), item["timestamp"], 0)
+            _LOGGER.debug("EPG snapshot loaded: %s", [key[0] for key in self._entries])
+            return True
+        except FileNotFoundError:
+            _LOGGER.debug("No EPG snapshot file %s", self._snapshot_path)
+        except (OSError, EOFError, KeyError, TypeError, ValueError, AttributeError) as ex:
+            _LOGGER.warning("Cannot load the EPG snapshot file %s: %s", self._snapshot_path, ex)
+        return False
+
+
+epg_cache = EpgCache()
@@ -0,0 +1,159 @@
+"""
+Incremental JSON parsing of the large payloads of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import codecs
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, AsyncIterable, AsyncIterator
+
+JSON_STREAM_COMPACT_SIZE = 64 * 1024
+
+JsonPath = tuple[str | int, ...]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_CLOSING = {"{": "}", "[": "]"}
+_NUMBER_CHARS = frozenset(".eE+-0123456789")
+
+
+class _Frame:
+    """Container being parsed : object or array, current key or index and expected token."""
+
+    # pylint: disable=R0903
+
+    __slots__ = ("kind", "key", "state")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.key: str | int = -1
+        self.state = "key" if kind == "{" else "value"
+
+
+class JsonItemStream:
+    """Incremental JSON parser yielding the values nested at a given depth as soon as they are complete.
+
+    Containers above the target depth are walked token by token, values at the target depth are decoded in one go by
+    the C decoder and then released from the buffer. Values above the target depth which are not containers are
+    skipped. For instance with depth 2, ``{"a": [1, 2], "b": [3]}`` yields ``(("a", 0), 1)``, ``(("a", 1), 2)`` and
+    ``(("b", 0), 3)``.
+    """
+
+    # pylint: disable=R0903
+
+    def __init__(self, depth: int):
+        """Create the parser of the values at the given depth (1 for the items of the root container)."""
+        self._depth = depth
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._done = False
+
+    def feed(self, text: str, final: bool = False) -> list[tuple[JsonPath, Any]]:
+        """Parse the given text and return the (path, value) pairs completed by it.
+
+        :param text: next part of the JSON document
+        :param final: True if this is the last part of the document
+        :raises ValueError: if the document is invalid or truncated
+        """
+        pos = self._pos
+        if pos > JSON_STREAM_COMPACT_SIZE:
+            self._buffer = self._buffer[pos:]
+            self._pos = 0
+        self._buffer += text
+        items = self._parse(final)
+        if final and (not self._done or _WHITESPACE.match(self._buffer, self._pos).end() < len(self._buffer)):
+            raise ValueError(f"Invalid or truncated JSON document at position {self._pos}")
+        return items
+
+    def _path(self) -> JsonPath:
+        return tuple(frame.key for frame in self._stack)
+
+    def _end_value(self) -> None:
+        """Mark the current value of the innermost container as parsed."""
+        if self._stack:
+            self._stack[-1].state = "comma"
+        else:
+            self._done = True
+
+    def _parse(self, final: bool) -> list[tuple[JsonPath, Any]]:
+        # pylint: disable=R0912,R0915
+        items = []
+        buffer = self._buffer
+        pos = self._pos
+        while not self._done:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            frame = self._stack[-1] if self._stack else None
+            state = frame.state if frame else "value"
+            if frame and state != "colon" and char == _CLOSING[frame.kind]:
+                self._stack.pop()
+                self._end_value()
+                pos += 1
+            elif state == "comma":
+                if char != ",":
+                    raise ValueError(f"Expecting ',' delimiter at position {pos}")
+                frame.state = "key" if frame.kind == "{" else "value"
+                pos += 1
+            elif state == "key":
+                if char != '"':
+                    raise ValueError(f"Expecting property name at position {pos}")
+                try:
+                    frame.key, end = scanstring(buffer, pos + 1)
+                except ValueError:
+                    break
+                frame.state = "colon"
+                pos = end
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expecting ':' delimiter at position {pos}")
+                frame.state = "value"
+                pos += 1
+            else:
+                key = frame.key + 1 if frame and frame.kind == "[" else None
+                if len(self._stack) < self._depth and char in _CLOSING:
+                    if key is not None:
+                        frame.key = key
+                    self._stack.append(_Frame(char))
+                    pos += 1
+                    continue
+                try:
+                    value, end = self._decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if final:
+                        raise
+                    break
+                # A number at the end of the buffer may continue in the next part, also when it is split right
+                # after its fraction or exponent mark ("1." is decoded as 1 followed by an unexpected ".")
+                if (
+                    not final
+                    and isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and (end >= len(buffer) or buffer[end] in _NUMBER_CHARS)
+                ):
+                    break
+                if key is not None:
+                    frame.key = key
+                if len(self._stack) == self._depth:
+                    items.append((self._path(), value))
+                self._end_value()
+                pos = end
+        self._pos = pos
+        return items
+
+
+async def iter_json_items(chunks: AsyncIterable[bytes], depth: int) -> AsyncIterator[tuple[JsonPath, Any]]:
+    """Yield the (path, value) pairs at the given depth of a UTF-8 JSON document received by chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    stream = JsonItemStream(depth)
+    async for chunk in chunks:
+        for item in stream.feed(decoder.decode(chunk)):
+            yield item
+    for item in stream.feed(decoder.decode(b"", final=True), final=True):
+        yield item
@@ -65,10 +65,11 @@ class OrangeMediaPlayer(MediaPlayer, OrangeEntity):
             Attributes.STATE: device.state,
             Attributes.SOURCE: device.channel_name if device.channel_name else "",
             Attributes.SOURCE_LIST: device.channel_names,
-            Attributes.MEDIA_IMAGE_URL: device.show_img if device.show_img else "",
+            Attributes.MEDIA_IMAGE_URL: device.media_image_url,
             Attributes.MEDIA_TITLE: device.show_title if device.show_title else "",
             Attributes.MEDIA_ARTIST: device.channel_episode if device.channel_episode else "",
             Attributes.MEDIA_POSITION: device.show_position,
+            Attributes.MEDIA_POSITION_UPDATED_AT: device.position_updated_at,
             Attributes.MEDIA_DURATION: device.show_duration,
             Attributes.MEDIA_TYPE: device.media_type if device.media_type else MediaType.TVSHOW,
         }
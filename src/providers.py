@@ -0,0 +1,178 @@
+"""
+EPG providers of the countries supported by the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, AsyncIterable, Iterable
+
+import const_france
+import const_poland
+from epg import EpgData, EpgGuide, EpgProvider, EpgTimeline, Program
+from jsonstream import iter_json_items
+
+POLAND_IMAGE_URL = "https://tvgo.orange.pl"
+POLAND_CHANNEL_ID_PATTERN = re.compile(r"\d+")
+
+
+class FranceEpgProvider(EpgProvider):
+    """EPG of the France STB : programs of the current period grouped by channel, channels can be requested."""
+
+    country = "france"
+    url = const_france.EPG_URL
+    user_agent = const_france.EPG_USER_AGENT
+    timezone = const_france.TIMEZONE
+    channels = const_france.CHANNELS
+    channel_requests = True
+
+    def request_params(self, channel_id: str | None = None) -> dict[str, str]:
+        """Return the query parameters of the EPG request of the given channels (comma-separated), all if not set."""
+        params = OrderedDict({"groupBy": "channel", "period": "current"})
+        if channel_id:
+            params["epgIds"] = channel_id
+        params["mco"] = "OFR"
+        return params
+
+    async def parse(self, chunks: AsyncIterable[bytes]) -> EpgData:
+        """Parse the payload grouped by channel as it is received."""
+        data: EpgData = {}
+        async for path, entry in iter_json_items(chunks, 2):
+            if isinstance(path[1], int) and isinstance(entry, dict):
+                program = self.program(entry)
+                if program is not None:
+                    data.setdefault(path[0], []).append(program)
+        return data
+
+    @staticmethod
+    def program(entry: dict[str, Any]) -> Program | None:
+        """Build the program of an EPG entry, None if it has no valid schedule."""
+        try:
+            start = int(entry["diffusionDate"])
+            duration = int(entry["duration"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        series_title = season_number = episode = None
+        season = entry.get("season", None)
+        if entry.get("programType", None) == "EPISODE" and isinstance(season, dict):
+            serie = season.get("serie", None)
+            series_title = serie.get("title", None) if isinstance(serie, dict) else None
+            series_title = series_title if series_title is not None else ""
+            season_number = season.get("number", None)
+            episode = entry.get("episodeNumber", None) or 0
+        image = None
+        covers = entry.get("covers", None)
+        if covers and isinstance(covers, list):
+            # The second cover is the best suited to the Remote screen
+            image = (covers[1] if len(covers) > 1 else covers[0]).get("url", None)
+        return Program(
+            channel_id=entry.get("channelId", None),
+            start=start,
+            duration=duration,
+            title=entry.get("title", None),
+            series_title=series_title,
+            season=season_number,
+            episode=episode,
+            genre=entry.get("genre", None),
+            definition=entry.get("definition", None),
+            image=image,
+        )
+
+
+class PolandEpgProvider(EpgProvider):
+    """EPG of the Poland STB : schedules of all the channels, which cannot be requested individually.
+
+    Channels are identified by external identifiers containing the STB channel identifiers : schedules are grouped
+    by STB channel identifier when known, the numbers of the external identifiers are registered as guide aliases.
+    """
+
+    country = "poland"
+    url = const_poland.EPG_URL
+    user_agent = const_poland.EPG_USER_AGENT
+    timezone = const_poland.TIMEZONE
+    channels = const_poland.CHANNELS
+    channel_requests = False
+
+    def __init__(self):
+        """Create the provider."""
+        self._channel_ids = frozenset(channel["epg_id"] for channel in self.channels)
+
+    def request_params(self, channel_id: str | None = None) -> dict[str, str]:
+        """Return the query parameters of the EPG request, the whole guide is always requested."""
+        return OrderedDict({"hhTech": "", "deviceCat": "otg"})
+
+    async def parse(self, chunks: AsyncIterable[bytes]) -> EpgData:
+        """Parse the channel schedules as they are received."""
+        data: EpgData = {}
+        async for path, channel in iter_json_items(chunks, 2):
+            if path[0] != "epg" or not isinstance(channel, dict):
+                continue
+            external_id = channel.get("channelExternalId", None)
+            schedule = channel.get("schedule", None)
+            if external_id is None or not isinstance(schedule, list):
+                continue
+            channel_id = self.channel_id(str(external_id))
+            programs = (self.program(channel_id, entry) for entry in schedule if isinstance(entry, dict))
+            data.setdefault(channel_id, []).extend(program for program in programs if program is not None)
+        return data
+
+    def build_guide(self, data: EpgData) -> EpgGuide:
+        """Index the given schedules, with the numbers of the unknown external identifiers as aliases."""
+        timelines = {channel_id: EpgTimeline(programs) for channel_id, programs in data.items()}
+        return EpgGuide(timelines, aliases=self.aliases(timelines))
+
+    def channel_id(self, external_id: str) -> str:
+        """Return the STB channel identifier of the given external identifier, or the external identifier."""
+        for number in POLAND_CHANNEL_ID_PATTERN.findall(external_id):
+            if number in self._channel_ids:
+                return number
+        return external_id
+
+    @staticmethod
+    def aliases(channel_ids: Iterable[str]) -> dict[str, str]:
+        """Map the numbers of the given external identifiers to these identifiers."""
+        aliases: dict[str, str] = {}
+        for channel_id in channel_ids:
+            for number in POLAND_CHANNEL_ID_PATTERN.findall(channel_id):
+                if number != channel_id:
+                    aliases.setdefault(number, channel_id)
+        return aliases
+
+    @staticmethod
+    def program(channel_id: str, entry: dict[str, Any]) -> Program | None:
+        """Build the program of a channel schedule entry, None if it has no valid schedule."""
+        try:
+            start = int(entry["startDate"])
+            duration = int(entry["endDate"]) - start
+        except (KeyError, TypeError, ValueError):
+            return None
+        title = entry.get("name", None)
+        image_path = entry.get("imagePath", None)
+        return Program(
+            channel_id=channel_id,
+            start=start,
+            duration=duration,
+            title=title,
+            # The series title is not provided : the name of the program is the one of the series
+            series_title="" if entry.get("isSeries", False) else None,
+            episode=entry.get("episodeNumber", None),
+            image=f"{POLAND_IMAGE_URL}{image_path}" if image_path is not None else None,
+        )
+
+
+EPG_PROVIDERS: dict[str, EpgProvider] = {
+    provider.country: provider for provider in (FranceEpgProvider(), PolandEpgProvider())
+}
+
+
+def get_epg_provider(country: str) -> EpgProvider:
+    """Return the EPG provider of the given country.
+
+    :raises ValueError: if the country is not supported
+    """
+    provider = EPG_PROVIDERS.get(country, None)
+    if provider is None:
+        raise ValueError(f"Unsupported country {country}")
+    return provider
@@ -121,30 +121,11 @@ class OrangeRemote(Remote, OrangeEntity):
             await asyncio.sleep(delay)
         return res
 
-    def filter_changed_attributes(self, update: dict[str, Any]) -> dict[str, Any]:
-        """
-        Filter the given attributes and return only the changed values.
-
-        :param update: dictionary with attributes.
-        :return: filtered entity attributes containing changed attributes only.
-        """
-        attributes = {}
-
-        if Attributes.STATE in update:
-            state = REMOTE_STATE_MAPPING.get(update[Attributes.STATE])
-            attributes = self._key_update_helper(Attributes.STATE, state, attributes)
-        if attributes:
-            _LOG.debug("Orange remote update attributes %s -> %s", update, attributes)
-        return attributes
-
-    def _key_update_helper(self, key: str, value: str | None, attributes):
-        if value is None:
-            return attributes
-
-        if key in self.attributes:
-            if self.attributes[key] != value:
-                attributes[key] = value
-        else:
-            attributes[key] = value
-
-        return attributes
+    def update_attributes(self, update: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Return updated remote state from full update if provided or remote state if no update is provided."""
+        if update is None:
+            return {Attributes.STATE: REMOTE_STATE_MAPPING.get(self._device.state)}
+        state = REMOTE_STATE_MAPPING.get(update.get(Attributes.STATE, None), None)
+        if state is None:
+            return {}
+        return {Attributes.STATE: state}
@@ -0,0 +1,227 @@
+"""
+Polling schedule of the Orange TV devices.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from const import DEFAULT_POLL_MAX_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_INTERVAL = 10
+POLL_BOOST_DURATION = 20
+POLL_IDLE_AFTER = 60
+POLL_PROGRAM_END_MARGIN = 2
+
+
+class AdaptivePollInterval:
+    """Compute the delay before the next poll of a device.
+
+    Polls are faster right after a user command or when the current program is about to end, and slower when
+    nothing changed for a while or when the device is in standby.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_POLL_MIN_INTERVAL,
+        max_interval: float = DEFAULT_POLL_MAX_INTERVAL,
+        interval: float = POLL_INTERVAL,
+    ):
+        """Create the poll interval with the given bounds."""
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        self._boost_until: float = 0
+        self._last_change: float = time.monotonic()
+
+    def on_command(self) -> None:
+        """Poll faster after a user command."""
+        self._boost_until = time.monotonic() + POLL_BOOST_DURATION
+        self._last_change = time.monotonic()
+
+    def on_change(self) -> None:
+        """Record that the device state has changed."""
+        self._last_change = time.monotonic()
+
+    def next_interval(self, standby: bool = False, program_end: float | None = None) -> float:
+        """Return the delay in seconds before the next poll.
+
+        :param standby: True if the device is in standby
+        :param program_end: end timestamp of the current program if any
+        """
+        now = time.monotonic()
+        if now < self._boost_until:
+            return self.min_interval
+        if standby:
+            return self.max_interval
+        interval = self.interval
+        # Slow down by doubling the interval for every idle period
+        idle_periods = int((now - self._last_change) // POLL_IDLE_AFTER)
+        if idle_periods > 0:
+            interval = min(interval * (2 ** min(idle_periods, 8)), self.max_interval)
+        if program_end:
+            remaining = program_end - time.time() + POLL_PROGRAM_END_MARGIN
+            if remaining > 0:
+                interval = min(interval, max(remaining, self.min_interval))
+        return interval
+
+
+POLL_MAX_IN_FLIGHT = 4
+POLL_MAX_SPACING = 1.0
+POLL_LAG_WARNING = 5.0
+
+
+@dataclass
+class _PollJob:
+    """Polling job of a device."""
+
+    device_id: str
+    poll: Callable[[], Awaitable[bool]]
+    interval: Callable[[], float]
+    deadline: float = 0
+    version: int = 0
+    running: bool = False
+    lag: float = 0
+
+
+class PollScheduler:
+    """Single scheduler of the polling requests of all the configured devices.
+
+    Device deadlines are kept in a heap, dispatches are spaced out so that the requests are spread over the poll
+    interval instead of bursting together, and the number of polls in flight is capped.
+    """
+
+    def __init__(self, max_in_flight: int = POLL_MAX_IN_FLIGHT, interval: float = POLL_INTERVAL):
+        """Create the scheduler."""
+        self._interval = interval
+        self._jobs: dict[str, _PollJob] = {}
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._counter = itertools.count()
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_dispatch: float = 0
+
+    def __contains__(self, device_id: str) -> bool:
+        """Return true if the given device is polled."""
+        return device_id in self._jobs
+
+    @property
+    def lags(self) -> dict[str, float]:
+        """Return the last dispatch lag in seconds of every polled device."""
+        return {device_id: job.lag for device_id, job in self._jobs.items()}
+
+    def add(self, device_id: str, poll: Callable[[], Awaitable[bool]], interval: Callable[[], float]) -> None:
+        """Start polling the given device.
+
+        :param device_id: device identifier
+        :param poll: coroutine function polling the device, returns False to stop polling
+        :param interval: function returning the delay before the next poll
+        """
+        job = self._jobs.get(device_id, None)
+        if job is not None:
+            if job.poll == poll:
+                return
+            # The device has been recreated (reconfiguration) : replace the job of the previous instance
+            self.remove(device_id)
+        job = _PollJob(device_id=device_id, poll=poll, interval=interval)
+        self._jobs[device_id] = job
+        # Stagger the first polls of the devices over the interval
+        offset = (len(self._jobs) - 1) * self._spacing() if len(self._jobs) > 1 else 0
+        self._push(job, time.monotonic() + offset)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def remove(self, device_id: str, poll: Callable[[], Awaitable[bool]] | None = None) -> None:
+        """Stop polling the given device, only if polled with the given coroutine function if set."""
+        job = self._jobs.get(device_id, None)
+        if job is not None and (poll is None or job.poll == poll):
+            del self._jobs[device_id]
+            job.version += 1
+        if not self._jobs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def wake(self, device_id: str) -> None:
+        """Bring the next poll of the given device forward if its interval got shorter."""
+        job = self._jobs.get(device_id, None)
+        if job is None or job.running:
+            return
+        deadline = time.monotonic() + job.interval()
+        if deadline < job.deadline:
+            self._push(job, deadline)
+
+    def _spacing(self) -> float:
+        """Return the minimum delay between two dispatches."""
+        return min(self._interval / max(len(self._jobs), 1), POLL_MAX_SPACING)
+
+    def _push(self, job: _PollJob, deadline: float) -> None:
+        """Schedule the next poll of the given job, previous heap entries of the job become stale."""
+        job.version += 1
+        job.deadline = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), job.device_id, job.version))
+        self._wakeup.set()
+
+    def _pop_due(self) -> tuple[_PollJob | None, float]:
+        """Return the next due job or the delay before the next deadline."""
+        while self._heap:
+            deadline, _, device_id, version = self._heap[0]
+            job = self._jobs.get(device_id, None)
+            if job is None or job.version != version or job.running:
+                heapq.heappop(self._heap)
+                continue
+            delay = max(deadline - time.monotonic(), self._last_dispatch + self._spacing() - time.monotonic())
+            if delay > 0:
+                return None, delay
+            heapq.heappop(self._heap)
+            return job, 0
+        return None, self._interval
+
+    async def _run(self) -> None:
+        """Dispatch the polls of the devices when they are due."""
+        while self._jobs:
+            job, delay = self._pop_due()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._semaphore.acquire()
+            now = time.monotonic()
+            self._last_dispatch = now
+            job.lag = now - job.deadline
+            if job.lag > POLL_LAG_WARNING:
+                _LOGGER.warning("Poll of device %s is late by %.1fs", job.device_id, job.lag)
+            job.running = True
+            asyncio.get_event_loop().create_task(self._poll(job))
+
+    async def _poll(self, job: _PollJob) -> None:
+        """Poll the device of the given job and schedule its next poll."""
+        version = job.version
+        keep_polling = False
+        try:
+            keep_polling = await job.poll()
+        # pylint: disable=W0718
+        except Exception as ex:
+            _LOGGER.error("Error while polling device %s: %s", job.device_id, ex)
+            keep_polling = True
+        finally:
+            job.running = False
+            self._semaphore.release()
+        if self._jobs.get(job.device_id, None) is not job or job.version != version:
+            return
+        if keep_polling:
+            self._push(job, time.monotonic() + job.interval())
+        else:
+            self.remove(job.device_id)
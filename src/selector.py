@@ -6,7 +6,7 @@ Select entity functions.
 """
 
 import logging
-from typing import Any
+from typing import Any, Sequence
 
 from ucapi import EntityTypes, Select, StatusCodes
 from ucapi.api_definitions import CommandHandler
@@ -59,7 +59,7 @@ class OrangeSelect(OrangeEntity, Select):
         raise NotImplementedError()
 
     @property
-    def select_options(self) -> list[str]:
+    def select_options(self) -> Sequence[str]:
         """Return selection list."""
         raise NotImplementedError()
 
@@ -152,6 +152,6 @@ class OrangeChannelSelect(OrangeSelect):
         return self._device.channel_name
 
     @property
-    def select_options(self) -> list[str]:
+    def select_options(self) -> Sequence[str]:
         """Return selection list."""
         return self._device.channel_names
@@ -0,0 +1,112 @@
+"""
+Shared HTTP connection pool of the integration driver.
+
+:copyright: (c) 2025 Albaintor
+:license: Mozilla Public License Version 2.0, see LICENSE for more details.
+"""
+
+import logging
+import ssl
+from collections import Counter
+from typing import Any
+
+import aiohttp
+import certifi
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+POOL_LIMIT = 30
+POOL_LIMIT_PER_HOST = 4
+POOL_KEEPALIVE_TIMEOUT = 60
+POOL_DNS_CACHE_TTL = 10 * 60
+
+
+class SessionManager:
+    """Driver-wide aiohttp session borrowed by all the clients for STB, EPG and artwork requests.
+
+    A single tuned connector keeps connections alive per host and caches DNS resolutions, and the SSL contexts are
+    shared so that woopic.com and tvgo.orange.pl connections are reused instead of paying TCP and TLS setup again.
+    """
+
+    def __init__(self):
+        """Create the session manager, the session itself is created on first use."""
+        self._session: ClientSession | None = None
+        self._connector: TCPConnector | None = None
+        self.ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self.ssl_context_no_verify = ssl.create_default_context()
+        self.ssl_context_no_verify.check_hostname = False
+        self.ssl_context_no_verify.verify_mode = ssl.CERT_NONE
+        self._requests = 0
+        self._created: Counter[str] = Counter()
+        self._reused: Counter[str] = Counter()
+
+    def session(self) -> ClientSession:
+        """Return the shared session, created if needed."""
+        if self._session is None or self._session.closed:
+            self._connector = TCPConnector(
+                limit=POOL_LIMIT,
+                limit_per_host=POOL_LIMIT_PER_HOST,
+                keepalive_timeout=POOL_KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=POOL_DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                raise_for_status=True,
+                trust_env=True,
+                trace_configs=[self._trace_config()],
+            )
+        return self._session
+
+    def _trace_config(self) -> TraceConfig:
+        """Build the trace configuration collecting connection pool metrics."""
+
+        async def on_request_start(_session, context, params: aiohttp.TraceRequestStartParams):
+            self._requests += 1
+            context.host = params.url.host
+
+        async def on_connection_create_end(_session, context, _params):
+            self._created[context.host] += 1
+
+        async def on_connection_reuseconn(_session, context, _params):
+            self._reused[context.host] += 1
+
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return the connection pool metrics."""
+        created = sum(self._created.values())
+        reused = sum(self._reused.values())
+        return {
+            "requests": self._requests,
+            "connections_created": created,
+            "connections_reused": reused,
+            "pool_hit_ratio": reused / (created + reused) if created + reused > 0 else 0,
+            "open_connections": self.connections,
+            "hosts": {host: {"created": self._created[host], "reused": self._reused[host]} for host in self._created},
+        }
+
+    @property
+    def connections(self) -> int:
+        """Return the number of connections currently acquired or kept alive."""
+        if self._connector is None or self._connector.closed:
+            return 0
+        # pylint: disable=W0212
+        return len(self._connector._acquired) + sum(len(conns) for conns in self._connector._conns.values())
+
+    async def close(self) -> None:
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            _LOGGER.debug("Closing shared HTTP session: %s", self.metrics)
+            await self._session.close()
+        self._session = None
+        self._connector = None
+
+
+session_manager = SessionManager()
@@ -26,7 +26,11 @@ import config
 import discover
 from client import OrangeTVClient
 from config import OrangeConfigDevice
-from const import OPERATION_INFORMATION
+from const import (
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    OPERATION_INFORMATION,
+)
 
 _LOG = logging.getLogger(__name__)
 
@@ -69,6 +73,15 @@ _user_input_discovery = RequestUserInput(
                 }
             },
         },
+        {
+            "id": "rescan",
+            "label": {
+                "en": "Search the network again",
+                "de": "Netzwerk erneut durchsuchen",
+                "fr": "Rechercher à nouveau sur le réseau",
+            },
+            "field": {"checkbox": {"value": False}},
+        },
     ],
 )
 
@@ -388,6 +401,38 @@ async def handle_configuration_mode(msg: UserDataResponse) -> RequestUserInput |
                         },
                         "field": {"checkbox": {"value": _reconfigured_device.log_client}},
                     },
+                    {
+                        "id": "poll_min_interval",
+                        "label": {
+                            "en": "Minimum polling interval (seconds)",
+                            "fr": "Intervalle minimum d'interrogation (secondes)",
+                        },
+                        "field": {
+                            "number": {
+                                "value": _reconfigured_device.poll_min_interval,
+                                "min": 1,
+                                "max": 60,
+                                "steps": 1,
+                                "decimals": 0,
+                            }
+                        },
+                    },
+                    {
+                        "id": "poll_max_interval",
+                        "label": {
+                            "en": "Maximum polling interval (seconds)",
+                            "fr": "Intervalle maximum d'interrogation (secondes)",
+                        },
+                        "field": {
+                            "number": {
+                                "value": _reconfigured_device.poll_max_interval,
+                                "min": 5,
+                                "max": 600,
+                                "steps": 1,
+                                "decimals": 0,
+                            }
+                        },
+                    },
                 ],
             )
         case "reset":
@@ -444,8 +489,10 @@ async def _handle_discovery(msg: UserDataResponse) -> RequestUserInput | SetupEr
             return SetupError(error_type=IntegrationSetupError.CONNECTION_REFUSED)
     else:
         _LOG.debug("Starting auto-discovery driver setup")
-        devices = await discover.async_identify_orangetv_devices()
-        for device in devices:
+        # The devices announced on the network are listed right away, the network is only searched (for the SSDP
+        # response window and the pending identifications) if none has been announced or if a rescan is requested
+        rescan = msg.input_values.get("rescan") == "true"
+        async for device in discover.async_discover_orangetv_devices(rescan=rescan):
             avr_data = {
                 "id": device.get("host"),
                 "label": {"en": f"{device.get('friendlyName')} [{device.get('host')}]"},
@@ -659,6 +706,8 @@ async def _handle_device_reconfigure(msg: UserDataResponse) -> SetupComplete | S
     port = 8080
     try:
         port = int(msg.input_values.get("port", 8080))
+        poll_min_interval = float(msg.input_values.get("poll_min_interval", DEFAULT_POLL_MIN_INTERVAL))
+        poll_max_interval = float(msg.input_values.get("poll_max_interval", DEFAULT_POLL_MAX_INTERVAL))
     except ValueError:
         return SetupError(error_type=IntegrationSetupError.OTHER)
     country = msg.input_values.get("country", "france")
@@ -671,6 +720,8 @@ async def _handle_device_reconfigure(msg: UserDataResponse) -> SetupComplete | S
     _reconfigured_device.country = country
     _reconfigured_device.always_on = always_on
     _reconfigured_device.log_client = log_client
+    _reconfigured_device.poll_min_interval = poll_min_interval
+    _reconfigured_device.poll_max_interval = max(poll_max_interval, poll_min_interval)
 
     config.devices.add_or_update(_reconfigured_device)  # triggers ATV instance update
     await asyncio.sleep(1)
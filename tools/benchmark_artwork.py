@@ -0,0 +1,69 @@
+"""Measure the event loop latency during artwork bursts, resized on the loop or in the image pool."""
+
+import asyncio
+import statistics
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(1, "src")
+
+# pylint: disable=C0413
+from PIL import Image  # noqa: E402
+
+from artwork import ImagePool, make_thumbnail  # noqa: E402
+
+POSTER_SIZE = (2000, 3000)
+BURST = 12
+TICK = 0.005
+
+
+def make_poster() -> bytes:
+    """Build a large JPEG poster."""
+    image = Image.effect_noise(POSTER_SIZE, 64).convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+async def measure_latency(stop: asyncio.Event) -> list[float]:
+    """Record how late a periodic timer fires, as a polling or websocket task would."""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+    return lags
+
+
+async def run(name: str, resize) -> None:
+    """Resize a burst of posters while measuring the loop latency."""
+    poster = make_poster()
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_latency(stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(resize(poster) for _ in range(BURST)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = await probe
+    print(
+        f"{name:28}: burst {elapsed * 1000:7.1f} ms, loop lag median {statistics.median(lags) * 1000:6.2f} ms, "
+        f"max {max(lags) * 1000:7.2f} ms"
+    )
+
+
+async def main() -> None:
+    """Compare inline resizing with the image pool."""
+
+    async def inline(content: bytes) -> bytes:
+        return make_thumbnail(content)
+
+    pool = ImagePool()
+    await run("Inline on the event loop", inline)
+    await run("Image pool", pool.thumbnail)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
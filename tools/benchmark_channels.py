@@ -0,0 +1,35 @@
+"""Compare the channel name matcher with the former fuzzy matching on raw channel dicts."""
+
+import sys
+import timeit
+
+sys.path.insert(1, "src")
+
+# pylint: disable=C0413
+from fuzzywuzzy import process  # noqa: E402
+
+from channels import ChannelIndex  # noqa: E402
+from const_france import CHANNELS  # noqa: E402
+
+QUERIES = ["france deux", "tf1 hd", "M6 4K", "rmc decouverte", "canal plus sport", "chaine l equipe", "arte"]
+NUMBER = 20
+
+
+def legacy_match(name):
+    """Former path : fuzzy matching against the stringified channel dicts."""
+    return process.extractOne(name, CHANNELS)[0]
+
+
+if __name__ == "__main__":
+    index = ChannelIndex(CHANNELS)
+    for query in QUERIES:
+        index.match(query)
+    cold = timeit.timeit(lambda: [ChannelIndex(CHANNELS).match(query) for query in QUERIES], number=NUMBER)
+    warm = timeit.timeit(lambda: [index.match(query) for query in QUERIES], number=NUMBER)
+    legacy = timeit.timeit(lambda: [legacy_match(query) for query in QUERIES], number=NUMBER)
+    count = NUMBER * len(QUERIES)
+    print(f"Legacy fuzzy matching : {legacy / count * 1e6:.1f} µs/query")
+    print(f"Matcher (cold)        : {cold / count * 1e6:.1f} µs/query")
+    print(f"Matcher (warm)        : {warm / count * 1e6:.1f} µs/query")
+    for query in QUERIES:
+        print(f"{query!r:20} -> {index.match(query)['name']!r:30} (legacy {legacy_match(query)['name']!r})")
@@ -0,0 +1,115 @@
+"""Compare the full JSON parsing of an EPG payload with the streaming parser, in time and peak memory."""
+
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(1, "src")
+
+# pylint: disable=C0413
+from epg import EPG_STREAM_CHUNK_SIZE  # noqa: E402
+from jsonstream import JsonItemStream  # noqa: E402
+from providers import FranceEpgProvider  # noqa: E402
+
+CHANNELS = 200
+PROGRAMS = 30
+
+
+def make_payload() -> bytes:
+    """Build a France payload grouped by channel, with the fields returned by the EPG gateway."""
+    payload = {}
+    start = int(time.time())
+    for channel in range(CHANNELS):
+        programs = []
+        for i in range(PROGRAMS):
+            programs.append(
+                {
+                    "id": f"{channel}-{i}",
+                    "channelId": str(channel),
+                    "title": f"Program {i}",
+                    "diffusionDate": start + i * 1800,
+                    "duration": 1800,
+                    "programType": "EPISODE",
+                    "season": {"number": 2, "serie": {"title": "Serie", "id": "s1", "synopsis": "S" * 300}},
+                    "episodeNumber": i,
+                    "definition": "HD",
+                    "genre": "Série",
+                    "genreDetailed": "Série dramatique",
+                    "synopsis": "Synopsis " * 40,
+                    "csa": 2,
+                    "languageVersion": "VF",
+                    "hearingImpaired": False,
+                    "audioDescription": False,
+                    "covers": [
+                        {"format": "RATIO_16_9", "url": f"https://proxymedia.woopic.com/{channel}/{i}/16_9.jpg"},
+                        {"format": "RATIO_4_3", "url": f"https://proxymedia.woopic.com/{channel}/{i}/4_3.jpg"},
+                    ],
+                }
+            )
+        payload[str(channel)] = programs
+    return json.dumps(payload).encode("utf-8")
+
+
+class Body:
+    """Response body received by chunks, recording when the last chunk has been received."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.received = 0.0
+
+    async def chunks(self):
+        """Yield the content by chunks, as received from the network."""
+        for start in range(0, len(self.content), EPG_STREAM_CHUNK_SIZE):
+            end = start + EPG_STREAM_CHUNK_SIZE
+            yield self.content[start:end]
+            await asyncio.sleep(0)
+        self.received = time.perf_counter()
+
+
+async def read_full(body: Body):
+    """Former path : the whole body is buffered then decoded in one go."""
+    content = b"".join([chunk async for chunk in body.chunks()])
+    return json.loads(content.decode("utf-8"))
+
+
+async def read_stream(body: Body):
+    """Streaming path : the payload is parsed as chunks are received."""
+    return await FranceEpgProvider().parse(body.chunks())
+
+
+def check_boundaries() -> None:
+    """Check that the streaming parser gives the same values wherever the payload is split, numbers included."""
+    document = '{"a": [1.5, -2e3, 10, 0.25E-2, true, null, "x\\"y", {"b": [1]}], "c": [3]}'
+    expected = JsonItemStream(2).feed(document, final=True)
+    for split in range(len(document)):
+        stream = JsonItemStream(2)
+        items = stream.feed(document[:split]) + stream.feed(document[split:], final=True)
+        assert items == expected, f"split at {split}: {items}"
+    print(f"Boundaries        : {len(document)} split positions checked")
+
+
+def measure(name: str, parse, content: bytes) -> None:
+    """Run the given parser and print its total duration, its duration after the last chunk and its peak memory."""
+    body = Body(content)
+    start = time.perf_counter()
+    asyncio.run(parse(body))
+    end = time.perf_counter()
+    tracemalloc.start()
+    data = asyncio.run(parse(Body(content)))
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    print(
+        f"{name:18}: total {(end - start) * 1000:6.1f} ms, after last chunk {(end - body.received) * 1000:6.1f} ms, "
+        f"peak {peak / 1e6:5.1f} MB, retained {retained / 1e6:5.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    check_boundaries()
+    payload = make_payload()
+    print(f"Payload: {len(payload) / 1e6:.1f} MB, {CHANNELS} channels, {PROGRAMS} programs per channel")
+    measure("Full json.loads", read_full, payload)
+    measure("Streaming parser", read_stream, payload)